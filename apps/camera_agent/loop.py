@@ -0,0 +1,88 @@
+import os
+import time
+import threading
+from queue import Queue
+import cv2
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+from packages.perception.vision import detect_frame
+from apps.orchestrator.event import Event
+from packages.common.types import release_detections
+
+DB = os.path.join(project_root, "data", "doorbell.db")
+
+# Motion gate: a frame only goes to the detector when more than MOTION_PX
+# grayscale pixels changed by more than MOTION_DELTA since the last frame.
+MOTION_DELTA = 25
+MOTION_PX = 500
+
+
+def driveway_loop(rtsp: str, bus: Queue, poll_sec: float = 1.0,
+                  db: str = DB, motion_px: int = MOTION_PX,
+                  stop: threading.Event | None = None):
+    stop = stop or threading.Event()
+    seen_since = None
+    last_present = False
+    moving_thing = False
+    snapshot = None
+    motion_pending = False
+    next_detect = 0.0
+
+    while not stop.is_set():
+        cap = cv2.VideoCapture(rtsp)
+        prev = None
+
+        while not stop.is_set() and cap.grab():
+            ok, frame = cap.retrieve()
+            if not ok:
+                continue
+
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            if prev is None:
+                motion = True
+            else:
+                diff = cv2.absdiff(gray, prev)
+                mask = cv2.threshold(diff, MOTION_DELTA, 255, cv2.THRESH_BINARY)[1]
+                motion = cv2.countNonZero(mask) > motion_px
+            prev = gray
+            motion_pending = motion_pending or motion
+
+            # monotonic: the debounce math must not jump with NTP/wall-clock changes
+            now = time.monotonic()
+
+            # Static scene → presence is unchanged, keep the last verdict
+            # instead of re-running the detector. Under motion, detect at
+            # most once per poll_sec (motion in between is remembered).
+            # No OCR: only the class flags are used here.
+            if motion_pending and now >= next_detect:
+                motion_pending = False
+                next_detect = now + poll_sec
+                # no source: the motion gate already screens out
+                # unchanged frames
+                vision = detect_frame(db, frame, debug=False, enable_ocr=False)
+                moving_thing = vision.person_present or vision.vehicle_present
+                kind = "person" if vision.person_present else "vehicle"
+                snapshot = vision.snapshot_path
+                # only the flags are used here; the Detections can be reused
+                release_detections(vision.detections)
+
+            if moving_thing:
+                if not last_present:
+                    seen_since = now
+                last_present = True
+
+                if now - seen_since > 3.0:  # in frame for >3s
+                    bus.put(Event(
+                        source="driveway",
+                        type="approach",
+                        kind=kind,
+                        snapshot=snapshot,
+                    ))
+                    # debounce a bit
+                    seen_since = now + 5.0
+            else:
+                last_present = False
+                seen_since = None
+
+        # stream dropped: back off, then reconnect
+        cap.release()
+        stop.wait(poll_sec)
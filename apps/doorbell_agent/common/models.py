@@ -0,0 +1,10 @@
+# apps/doorbell_agent/common/models.py
+# Scene types live in packages/common/types.py; re-exported here so the
+# doorbell agent has a single definition of each.
+from typing import Tuple
+
+from packages.common.types import Detection, Evidence, SceneObject, VisionResult
+
+BBox = Tuple[int, int, int, int]
+
+__all__ = ["BBox", "Detection", "Evidence", "SceneObject", "VisionResult"]
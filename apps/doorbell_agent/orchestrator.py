@@ -12,7 +12,7 @@ from packages.classify.intent import classify
 from packages.policy.loader import load_policies
 from packages.policy.apply import choose_action
 from packages.tts.piper import speak
-from storage.store import log_event
+from storage.store import log_events
 
 # Get absolute paths for data files
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
@@ -24,7 +24,8 @@ def handle_ring():
     policies = load_policies()
     # OBSERVE
     vision = snapshot_and_detect(DB, RTSP)
-    log_event(DB, etype="motion", mode=MODE, snapshot=vision.snapshot_path)
+    # rows are collected here and written in one transaction at the end
+    events = [dict(etype="motion", mode=MODE, snapshot=vision.snapshot_path)]
 
     # GREET
     greet = "Hi, I’m Echo-Bell. I keep an eye on things here.  How can I help?"
@@ -34,7 +35,7 @@ def handle_ring():
     asr = transcribe(seconds=4)
 
     # INTERPRET
-    cls = classify(asr.text, vision)
+    cls = classify(asr.text, vision, trace=False)
 
     # DECIDE
     ctx = {"intent": cls.intent, "mode": MODE, "vision": vision}
@@ -45,8 +46,9 @@ def handle_ring():
         speak(msg)
 
     # LOG
-    log_event(DB, etype="speak", intent=cls.intent, confidence=cls.conf, urgency=cls.urgency,
-              mode=MODE, snapshot=vision.snapshot_path, transcript=asr.text, actions=plan)
+    events.append(dict(etype="speak", intent=cls.intent, confidence=cls.conf, urgency=cls.urgency,
+                       mode=MODE, snapshot=vision.snapshot_path, transcript=asr.text, actions=plan))
+    log_events(DB, events)
 
 if __name__ == "__main__":
     print("Echo-Bell pre-LLM agent ready. Simulating a ring in 2s…")
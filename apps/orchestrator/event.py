@@ -1,20 +1,61 @@
+import atexit
 import time
 import sqlite3
+import threading
+import zlib
 from dataclasses import dataclass
 from typing import Dict, Optional
 
-from apps.orchestrator.event import Event  # your existing Event
+from storage.batch_writer import BatchWriter
 
 
-@dataclass
+# SQL used by BehaviorManager; prepared statements are reused because the
+# connection is long-lived (sqlite3 caches them by SQL text).
+_SQL_CREATE = """
+    CREATE TABLE IF NOT EXISTS alerts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        subject_key   INTEGER NOT NULL,
+        first_seen    REAL NOT NULL,
+        last_alert_ts REAL NOT NULL
+    )
+"""
+_SQL_INDEX = """
+    CREATE INDEX IF NOT EXISTS idx_alerts_subject
+    ON alerts(subject_key, last_alert_ts DESC)
+"""
+_SQL_RECENT = """
+    SELECT last_alert_ts
+    FROM alerts
+    WHERE subject_key = ?
+    ORDER BY last_alert_ts DESC
+    LIMIT 1
+"""
+_SQL_INSERT = """
+    INSERT INTO alerts (subject_key, first_seen, last_alert_ts)
+    VALUES (?, ?, ?)
+"""
+
+
+@dataclass(slots=True)
+class Event:
+    """A message on the event bus (camera approach, doorbell ring, ...)."""
+    source: str                     # "driveway" | "doorbell" | "system"
+    type: str                       # "approach" | "ring" | "shutdown"
+    kind: Optional[str] = None      # "person" | "vehicle"
+    snapshot: Optional[str] = None  # path to the frame that triggered it
+    payload: Optional[dict] = None  # e.g. {"num_vehicles": 1, "num_people": 0}
+
+
+@dataclass(slots=True)
 class SubjectState:
     """Tracks how long a given 'subject' (scene) has been present."""
     first_seen: float
     last_seen: float
     alert_sent: bool = False
+    last_alert_ts: float = 0.0  # 0.0 = never alerted
 
 
-@dataclass
+@dataclass(slots=True)
 class SceneSummary:
     """Last known scene for nicer, 'delta-aware' messages."""
     num_vehicles: int
@@ -40,30 +81,45 @@ class BehaviorManager:
         self.min_persist = min_persist
         self.alert_cooldown = alert_cooldown
 
-        # subject_key -> SubjectState
-        self.subjects: Dict[str, SubjectState] = {}
+        # subject_key -> SubjectState (swept in execute once it gets large)
+        self.subjects: Dict[int, SubjectState] = {}
+        self._sweep_at = 1024
+
+        # (source, type) -> id used in the high bits of subject keys
+        self._src_type_ids: Dict[tuple[str, str], int] = {}
 
         # last scene we alerted on (for “another car arrived” style phrasing)
         self.last_scene: Optional[SceneSummary] = None
 
+        # One long-lived connection shared by all callers (the orchestrator
+        # is multithreaded, hence check_same_thread=False + a lock).
+        # Autocommit mode: each statement is its own WAL append.
+        self._conn = sqlite3.connect(
+            db_path, check_same_thread=False, isolation_level=None,
+            cached_statements=256,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._db_lock = threading.Lock()
+
         self._ensure_tables()
 
+        # Cooldown is decided in memory; alerts rows are an audit trail
+        # written in batches by a background thread.
+        self._writer = BatchWriter(
+            self._conn, _SQL_INSERT, name="alert-writer",
+            max_rows=64, lock=self._db_lock,
+        )
+        # the writer is a daemon thread: don't lose what's queued at exit
+        atexit.register(self.close)
+
     # ---------- DB setup ----------
 
     def _ensure_tables(self) -> None:
-        """Create alerts table if it doesn't exist."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS alerts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    subject_key   TEXT NOT NULL,
-                    first_seen    REAL NOT NULL,
-                    last_alert_ts REAL NOT NULL
-                )
-                """
-            )
-            conn.commit()
+        """Create alerts table (and its cooldown lookup index) if missing."""
+        with self._db_lock:
+            self._conn.execute(_SQL_CREATE)
+            self._conn.execute(_SQL_INDEX)
 
     # ---------- Helpers to understand the scene ----------
 
@@ -71,63 +127,98 @@ class BehaviorManager:
         """
         Get num_vehicles / num_people from the event.
         - Preferred: evt.payload["num_vehicles"], evt.payload["num_people"]
+          (coerced with int(), so "2" or 2.0 work too)
         - Fallback: heuristics from evt.kind
         """
-        num_vehicles = 0
-        num_people = 0
-
-        if evt.payload:
-            num_vehicles = int(evt.payload.get("num_vehicles", 0))
-            num_people = int(evt.payload.get("num_people", 0))
-
-        # Fallback if payload isn't populated yet
-        if num_vehicles == 0 and evt.kind == "vehicle":
-            num_vehicles = 1
-        if num_people == 0 and evt.kind == "person":
-            num_people = 1
+        kind = evt.kind
+        p = evt.payload
+
+        # Camera-loop events carry only `kind`: skip the dict lookups
+        if p is None:
+            if kind == "vehicle":
+                return 1, 0
+            if kind == "person":
+                return 0, 1
+            return 0, 0
+
+        # int(): counts may arrive as floats or strings (JSON, OCR)
+        num_vehicles = int(p.get("num_vehicles") or 0)
+        num_people = int(p.get("num_people") or 0)
+        return (
+            num_vehicles if num_vehicles else (1 if kind == "vehicle" else 0),
+            num_people if num_people else (1 if kind == "person" else 0),
+        )
 
-        return num_vehicles, num_people
+    def _intern(self, source: str, type_: str) -> int:
+        """
+        Id for a (source, type) pair. crc32 rather than a counter so the
+        same pair maps to the same id after a restart (keys are persisted
+        in the alerts table). 31 bits, so the packed key fits SQLite's
+        signed 64-bit INTEGER.
+        """
+        sid = self._src_type_ids.get((source, type_))
+        if sid is None:
+            sid = zlib.crc32(f"{source}:{type_}".encode()) & 0x7FFFFFFF
+            self._src_type_ids[(source, type_)] = sid
+        return sid
 
-    def _subject_key(self, evt: Event, num_vehicles: int, num_people: int) -> str:
+    def _subject_key(self, evt: Event, num_vehicles: int, num_people: int) -> int:
         """
         Build a key that roughly identifies 'the same situation'.
         This is what we use to decide 'have we already alerted about this?'.
         You can enrich this later with color, carrier, etc.
+
+        Packed as (source,type) id << 32 | vehicles << 16 | people.
+        """
+        return (
+            (self._intern(evt.source, evt.type) << 32)
+            | ((num_vehicles & 0xFFFF) << 16)
+            | (num_people & 0xFFFF)
+        )
+
+    def _sweep_subjects(self, now: float) -> None:
+        """
+        Drop subjects not seen for 10x alert_cooldown. Their cooldown is
+        long over, and if they come back _last_alert_ts re-seeds it.
+
+        The next sweep waits until the dict has doubled, so a burst of
+        live subjects doesn't make every call pay for a full scan.
         """
-        return f"{evt.source}:{evt.type}:veh={num_vehicles}:ppl={num_people}"
+        cutoff = now - 10 * self.alert_cooldown
+        self.subjects = {
+            k: v for k, v in self.subjects.items() if v.last_seen > cutoff
+        }
+        self._sweep_at = max(1024, 2 * len(self.subjects))
 
     # ---------- DB alert history ----------
 
-    def _recent_alert_exists(self, subject_key: str, now: float) -> bool:
-        """Return True if we alerted on this subject_key within alert_cooldown."""
-        with sqlite3.connect(self.db_path) as conn:
-            row = conn.execute(
-                """
-                SELECT last_alert_ts
-                FROM alerts
-                WHERE subject_key = ?
-                ORDER BY last_alert_ts DESC
-                LIMIT 1
-                """,
-                (subject_key,),
-            ).fetchone()
-
-        if not row:
-            return False
-
-        last_alert_ts = float(row[0])
-        return (now - last_alert_ts) < self.alert_cooldown
-
-    def _record_alert(self, subject_key: str, first_seen: float, now: float) -> None:
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                """
-                INSERT INTO alerts (subject_key, first_seen, last_alert_ts)
-                VALUES (?, ?, ?)
-                """,
-                (subject_key, first_seen, now),
-            )
-            conn.commit()
+    def _last_alert_ts(self, subject_key: int) -> float:
+        """
+        Most recent alert time for subject_key from the audit table, or 0.0.
+        Only consulted when a subject is first seen, so cooldowns survive
+        a restart.
+        """
+        with self._db_lock:
+            row = self._conn.execute(_SQL_RECENT, (subject_key,)).fetchone()
+
+        return float(row[0]) if row else 0.0
+
+    def _record_alert(self, subject_key: int, state: SubjectState, now: float) -> None:
+        state.last_alert_ts = now
+        self._writer.put([(subject_key, state.first_seen, now)])
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until every alert queued before this call is written."""
+        return self._writer.flush(timeout)
+
+    def close(self) -> None:
+        """Write out queued alerts and close the connection (also run at exit)."""
+        if self._conn is None:
+            return
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
+            self._conn = None
 
     # ---------- Main entrypoint ----------
 
@@ -142,6 +233,9 @@ class BehaviorManager:
         """
         now = time.time()
 
+        if len(self.subjects) > self._sweep_at:
+            self._sweep_subjects(now)
+
         # 1) Understand scene composition
         num_vehicles, num_people = self._extract_counts(evt)
         subject_key = self._subject_key(evt, num_vehicles, num_people)
@@ -149,7 +243,11 @@ class BehaviorManager:
         # 2) Track persistence in memory
         state = self.subjects.get(subject_key)
         if state is None:
-            state = SubjectState(first_seen=now, last_seen=now)
+            state = SubjectState(
+                first_seen=now,
+                last_seen=now,
+                last_alert_ts=self._last_alert_ts(subject_key),
+            )
             self.subjects[subject_key] = state
         else:
             state.last_seen = now
@@ -159,12 +257,12 @@ class BehaviorManager:
             return {"status": "pending", "action": "none"}
 
         # 4) If we've already alerted about this subject recently, suppress
-        if self._recent_alert_exists(subject_key, now):
+        if state.last_alert_ts and (now - state.last_alert_ts) < self.alert_cooldown:
             state.alert_sent = True
             return {"status": "suppressed", "action": "none"}
 
         # 5) New or stale subject: record alert and generate a message
-        self._record_alert(subject_key, state.first_seen, now)
+        self._record_alert(subject_key, state, now)
         state.alert_sent = True
 
         # 6) Build a human-friendly message based on *change*
@@ -250,3 +348,15 @@ if __name__ == "__main__":
     time.sleep(2.1)
     # Second call: now past min_persist, should alert
     print("Second execute:", mgr.execute(e))
+
+    # Non-int counts (e.g. strings from JSON/OCR) are coerced, not rejected
+    odd = Event(
+        source="doorbell",
+        type="ring",
+        payload={"num_vehicles": 1.0, "num_people": "2"},
+    )
+    assert mgr._extract_counts(odd) == (1, 2)
+    zero = Event(source="doorbell", type="ring", kind="person",
+                 payload={"num_people": "0"})
+    assert mgr._extract_counts(zero) == (0, 1)
+    print("Non-int counts:", mgr.execute(odd))
@@ -1,84 +1,118 @@
+import asyncio
+import functools
+import signal
 import threading
 import sys
 import os
-import time
 
 # Add the project root to Python path
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 sys.path.insert(0, project_root)
 
-# Import Event class and EventBus
-sys.path.append(os.path.dirname(__file__))
-import event
-from event import Event
-
-# Import EventBus using importlib to handle the hyphenated filename
-import importlib.util
-event_bus_path = os.path.join(os.path.dirname(__file__), "event-bus.py")
-spec = importlib.util.spec_from_file_location("event_bus", event_bus_path)
-event_bus_module = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(event_bus_module)
-EventBus = event_bus_module.EventBus
-
-# Import handle_ring from the doorbell-agent directory
-import importlib.util
-doorbell_orchestrator_path = os.path.join(project_root, 'apps', 'doorbell-agent', 'orchestrator.py')
-spec = importlib.util.spec_from_file_location("doorbell_orchestrator", doorbell_orchestrator_path)
-doorbell_module = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(doorbell_module)
-handle_ring = doorbell_module.handle_ring
-
-# Import vision detection for driveway monitoring
-from packages.perception.vision import snapshot_and_detect
-
-# Import camera loop from camera-agent
-camera_loop_path = os.path.join(project_root, 'apps', 'camera-agent', 'loop.py')
-spec = importlib.util.spec_from_file_location("camera_loop_module", camera_loop_path)
-camera_loop_module = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(camera_loop_module)
-driveway_loop = camera_loop_module.driveway_loop
+# Import Event class
+from apps.orchestrator.event import Event
 
+# Import handle_ring from the doorbell agent
+from apps.doorbell_agent.orchestrator import handle_ring
+
+# Import camera loop from camera agent
+from apps.camera_agent.loop import driveway_loop
+
+
+class _ThreadSafeBus:
+    """bus.put() for producers running on executor threads."""
+
+    def __init__(self, queue: asyncio.Queue):
+        self._loop = asyncio.get_running_loop()
+        self._queue = queue
+
+    def put(self, event: Event):
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, event)
+
+    def shutdown(self):
+        """Ask main() to stop (safe from any thread or a signal handler)."""
+        self.put(Event(source="system", type="shutdown"))
+
+
+async def driveway_coro(bus: _ThreadSafeBus, rtsp: str, stop: threading.Event):
+    # The camera loop blocks on frame reads and OpenCV work, so it runs on
+    # the default executor and hands events back to the event loop.
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(
+        None, functools.partial(driveway_loop, rtsp, bus, stop=stop)
+    )
 
 # Simplified doorbell simulation
-def simulate_doorbell(bus):
-    time.sleep(5)  # Wait 5 seconds
+async def simulate_doorbell(bus: asyncio.Queue):
+    await asyncio.sleep(5)  # Wait 5 seconds
     event = Event(source="doorbell", type="ring")
-    bus.publish(event)
+    await bus.put(event)
     print("[Doorbell] Ring event published")
 
-def bell_orchestrator():
-    bus = EventBus()
-
-    # Start Camera 1 thread
-    threading.Thread(
-        target=driveway_loop,
-        args=("rtsp://driveway", bus),
-        daemon=True
-    ).start()
-
-    # Start doorbell thread
-    threading.Thread(
-        target=simulate_doorbell, 
-        args=(bus,), 
-        daemon=True
-    ).start()
+STOP = object()
+
+
+async def _on_approach(evt: Event):
+    print(f"[Bell] Approach → {evt.kind} ({evt.snapshot})")
+    # Optional: speak/alert
 
-    print("[Bell] Listening for events...")
 
-    while True:
-        evt: Event = bus.subscribe()
+async def _on_ring(evt: Event):
+    print("[Bell] Doorbell ring received.")
+    # Call the actual doorbell handler (blocking: vision, ASR, TTS)
+    await asyncio.get_running_loop().run_in_executor(None, handle_ring)
 
-        if evt.type == "shutdown":
-            print("[Bell] Shutting down.")
-            break
 
-        if evt.source == "driveway" and evt.type == "approach":
-            print(f"[Bell] Approach → {evt.kind} ({evt.snapshot})")
-            # Optional: speak/alert
+async def _on_shutdown(evt: Event):
+    print("[Bell] Shutting down.")
+    return STOP
 
-        if evt.source == "doorbell" and evt.type == "ring":
-            print("[Bell] Doorbell ring received.")
-            handle_ring()  # Call the actual doorbell handler
+
+# (source, type) -> handler; events with no entry are ignored
+HANDLERS = {
+    ("driveway", "approach"): _on_approach,
+    ("doorbell", "ring"): _on_ring,
+    ("system", "shutdown"): _on_shutdown,
+}
+
+
+async def main():
+    bus: asyncio.Queue = asyncio.Queue()
+    ts_bus = _ThreadSafeBus(bus)
+    stop = threading.Event()
+
+    # Ctrl-C / `kill` publish ("system", "shutdown") so the loop below
+    # stops through its handler and the finally block runs
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, ts_bus.shutdown)
+        except (NotImplementedError, RuntimeError):
+            pass  # e.g. Windows, or not on the main thread
+
+    tasks = [
+        # Camera 1
+        asyncio.create_task(driveway_coro(ts_bus, "rtsp://driveway", stop)),
+        # Doorbell
+        asyncio.create_task(simulate_doorbell(bus)),
+    ]
+
+    print("[Bell] Listening for events...")
+
+    try:
+        while True:
+            evt: Event = await bus.get()
+
+            handler = HANDLERS.get((evt.source, evt.type))
+            if handler and await handler(evt) is STOP:
+                break
+    finally:
+        stop.set()
+        for task in tasks:
+            task.cancel()
+
+def bell_orchestrator():
+    asyncio.run(main())
 
 if __name__ == "__main__":
     bell_orchestrator()
@@ -1,12 +1,29 @@
 # packages/classify/intent.py
 from __future__ import annotations
 from dataclasses import dataclass, field
-from collections import defaultdict
-import sqlite3, re, os, sys
+from collections import defaultdict, deque
+import sqlite3, re, os, sys, threading, operator
+import numpy as np
 from typing import Dict, List, Tuple
+from urllib.parse import quote
+
+try:
+    from re import _parser as _sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse as _sre_parse
+
+try:
+    import ahocorasick  # pyahocorasick (optional): one-pass literal matching
+except ImportError:
+    ahocorasick = None
+
+try:
+    from numba import njit  # optional: compiles the text scoring kernel
+except ImportError:
+    def njit(*_args, **_kwargs):
+        return lambda fn: fn
 
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 from packages.common.types import Evidence, VisionResult  # shared dataclasses
 
 
@@ -15,15 +32,30 @@ class Classified:
     intent: str
     conf: float
     urgency: int
-    trace: List[str] = field(default_factory=list)
+    trace: List[tuple] = field(default_factory=list)  # see format_trace
 
 
-def _project_root() -> str:
-    return os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+_DEFAULT_DB_PATH = os.path.join(_PROJECT_ROOT, "data", "doorbell.db")
 
 
-def _default_db_path() -> str:
-    return os.path.join(_project_root(), "data", "doorbell.db")
+# Rule-table queries, run on the cached per-thread rules connection.
+_SQL_INTENTS = "SELECT name FROM intent_def"
+_SQL_PATTERNS = """
+    SELECT pattern, is_regex,
+           COALESCE(intent_name, ''),
+           COALESCE(entity_name, ''),
+           weight
+    FROM pattern_def
+"""
+_SQL_ENTITIES = "SELECT name, tag, weight FROM entity_def"
+_SQL_SIGNAL_RULES = """
+    SELECT id, source, feature, operator, value, intent_name,
+           weight, min_conf, urgency
+    FROM signal_rule
+    WHERE enabled = 1
+    ORDER BY id
+"""
 
 
 def _fetch_rules(conn: sqlite3.Connection) -> Tuple[
@@ -38,184 +70,628 @@ def _fetch_rules(conn: sqlite3.Connection) -> Tuple[
     - pattern_def(pattern, is_regex, intent_name, entity_name, weight)
     - entity_def(name, tag, weight)  -- tag is the 'canonical' intent key
     """
-    intents = [r[0] for r in conn.execute("SELECT name FROM intent_def").fetchall()]
+    intents = [r[0] for r in conn.execute(_SQL_INTENTS).fetchall()]
 
-    patterns = conn.execute("""
-        SELECT pattern, is_regex,
-               COALESCE(intent_name, ''),
-               COALESCE(entity_name, ''),
-               weight
-        FROM pattern_def
-    """).fetchall()
+    patterns = conn.execute(_SQL_PATTERNS).fetchall()
 
     entities = {
         (n or ''): (t or '', w if w is not None else 0.5)
-        for (n, t, w) in conn.execute(
-            "SELECT name, tag, weight FROM entity_def"
-        ).fetchall()
+        for (n, t, w) in conn.execute(_SQL_ENTITIES).fetchall()
     }
 
     return intents, patterns, entities
 
 
+def _intern(s):
+    return sys.intern(s) if isinstance(s, str) else s
+
+
+# signal_rule.operator -> test(evidence_value, rule_value), resolved once
+# per rule at load time instead of an if/elif on the name per evidence.
+_SIGNAL_OPS = {
+    "equals": operator.eq,
+    "contains": operator.contains,  # rule_value in evidence_value
+}
+
+
+def _fetch_signal_rules(conn: sqlite3.Connection) -> Dict[
+    Tuple[str, str], List[Tuple[int, str, str, str, float, float, int]]
+]:
+    """
+    Enabled signal_rule rows bucketed by (source, feature), each row
+    normalized once at fetch time:
+    (id, operator, match, value_lower, intent_name, weight, min_conf,
+     urgency) with the defaults applied and match = _SIGNAL_OPS[operator].
+    Buckets keep id order.
+    """
+    rows = conn.execute(_SQL_SIGNAL_RULES).fetchall()
+
+    # Interned so bucket lookups and operator tests against the (interned)
+    # string literals evidence is built from compare by identity.
+    by_sf: Dict[Tuple[str, str], List[tuple]] = defaultdict(list)
+    for rule_id, source, feature, op, val, intent, weight, min_conf, urg in rows:
+        match = _SIGNAL_OPS.get(op)
+        if match is None:
+            continue  # unknown operator: can never fire
+        by_sf[(_intern(source), _intern(feature))].append(
+            (rule_id, _intern(op), match, str(val).lower(), intent,
+             float(weight or 1.0), float(min_conf or 0.0), int(urg or 10))
+        )
+    return dict(by_sf)
+
+
+def _case_free(pattern: str) -> bool:
+    """
+    True if `pattern` matches lowercased ASCII text the same with or
+    without re.IGNORECASE: no literal, class member or range in it can
+    stand for A-Z, or for a non-ASCII char (some case-fold onto ASCII,
+    e.g. the Kelvin sign onto 'k'). Checked on the parsed pattern, so
+    escapes like \x41 and ranges like [@-^] are caught too.
+    """
+    # The parser is a private CPython module whose opcodes and tuple
+    # layouts shift between versions: any surprise just means "keep
+    # IGNORECASE", never a failed rule load.
+    try:
+        return _case_free_tree(_sre_parse.parse(pattern))
+    except Exception:
+        return False
+
+
+def _case_free_tree(parsed) -> bool:
+    stack = [parsed]
+    while stack:
+        for op, av in stack.pop():
+            name = op.name
+            if name in ("LITERAL", "NOT_LITERAL"):
+                if av > 127 or 65 <= av <= 90:
+                    return False
+            elif name == "RANGE":
+                lo, hi = av
+                if hi > 127 or (lo <= 90 and hi >= 65):
+                    return False
+            elif name in ("IN", "ATOMIC_GROUP"):
+                stack.append(av)
+            elif name == "SUBPATTERN":
+                stack.append(av[-1])
+            elif name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT"):
+                stack.append(av[2])
+            elif name == "BRANCH":
+                stack.extend(av[1])
+            elif name in ("ASSERT", "ASSERT_NOT"):
+                stack.append(av[1])
+            elif name == "GROUPREF_EXISTS":
+                stack.extend(x for x in av[1:] if x)
+            elif name not in ("ANY", "AT", "CATEGORY", "NEGATE", "GROUPREF"):
+                return False  # anything unfamiliar: stay case-insensitive
+    return True
+
+
+# Compiled regexes by (pattern text, ascii_lower). Survives rule reloads
+# (_build_rules is re-run whenever the DB changes), so each pattern
+# compiles once per process rather than once per reload.
+_PATTERN_CACHE: Dict[Tuple[str, bool], re.Pattern] = {}
+
+
+def _get_re(pattern: str, ascii_lower: bool = False) -> re.Pattern:
+    """
+    Compiled `pattern`, case-insensitive. With ascii_lower, for use on
+    lowercased ASCII text only: compiled without IGNORECASE (no per-char
+    case folding in the engine) when _case_free says that's equivalent.
+    """
+    key = (pattern, ascii_lower)
+    rx = _PATTERN_CACHE.get(key)
+    if rx is None:
+        flags = 0 if ascii_lower and _case_free(pattern) else re.IGNORECASE
+        rx = _PATTERN_CACHE[key] = re.compile(pattern, flags)
+    return rx
+
+
+class _Automaton:
+    """
+    Minimal pure-Python Aho-Corasick with the subset of pyahocorasick's
+    Automaton API that _PatternMatcher uses (add_word, make_automaton,
+    iter). States are ints; goto[s] maps a char to the next state.
+    """
+
+    def __init__(self):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.out: List[tuple] = [()]
+        self.fail: List[int] = [0]
+
+    def add_word(self, word: str, value) -> None:
+        s = 0
+        for ch in word:
+            nxt = self.goto[s].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[s][ch] = nxt
+                self.goto.append({})
+                self.out.append(())
+            s = nxt
+        self.out[s] += (value,)
+
+    def make_automaton(self) -> None:
+        goto, out = self.goto, self.out
+        fail = self.fail = [0] * len(goto)
+        queue = deque(goto[0].values())  # depth 1 fails to the root
+        while queue:
+            s = queue.popleft()
+            for ch, nxt in goto[s].items():
+                queue.append(nxt)
+                f = fail[s]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] += out[fail[nxt]]
+
+    def iter(self, t: str):
+        goto, fail, out = self.goto, self.fail, self.out
+        s = 0
+        for end, ch in enumerate(t):
+            while s and ch not in goto[s]:
+                s = fail[s]
+            s = goto[s].get(ch, 0)
+            for value in out[s]:
+                yield end, value
+
+
+# Below this many distinct literals a C-level `in` per literal beats
+# walking _Automaton one char at a time in Python.
+_PY_AUTOMATON_MIN = 128
+
+
+# A backreference means the pattern can't be spliced into a bigger
+# alternation (group numbers shift), so it is always searched on its own.
+_BACKREF = re.compile(r"\\[1-9]|\(\?P=")
+
+
+class _RegexSet:
+    """
+    The regex half of _PatternMatcher, for one kind of text (any text, or
+    lowercased ASCII only; see _get_re).
+
+    One finditer pass over a named-group alternation; it reports the
+    leftmost hit at each position, so patterns it didn't name are
+    searched individually, but only if it hit at all.
+    """
+
+    def __init__(self, unioned: List[Tuple[int, str]], loose: List[Tuple[int, str]],
+                 ascii_lower: bool):
+        self.unioned = [(i, _get_re(p, ascii_lower)) for i, p in unioned]
+        self.loose = [(i, _get_re(p, ascii_lower)) for i, p in loose]
+
+        self.union = None
+        self.group_idx: Dict[str, int] = {}
+        if unioned:
+            try:
+                # each alternative carries its own flags; the union has none
+                self.union = re.compile("|".join(
+                    f"(?P<_r{i}>{rx.pattern})" if not rx.flags & re.IGNORECASE
+                    else f"(?P<_r{i}>(?i:{rx.pattern}))"
+                    for i, rx in self.unioned
+                ))
+                self.group_idx = {f"_r{i}": i for i, _rx in self.unioned}
+            except re.error:
+                # e.g. an inline global flag that is only legal at the
+                # start, or a group name used by two patterns
+                self.union = None
+
+    def add_hits(self, t: str, found: set) -> None:
+        if self.union is not None:
+            group_idx = self.group_idx
+            matched = {group_idx[m.lastgroup] for m in self.union.finditer(t)}
+            if matched:
+                found |= matched
+                for i, rx in self.unioned:
+                    if i not in matched and rx.search(t):
+                        found.add(i)
+        else:
+            for i, rx in self.unioned:
+                if rx.search(t):
+                    found.add(i)
+        for i, rx in self.loose:
+            if rx.search(t):
+                found.add(i)
+
+
+class _PatternMatcher:
+    """
+    Finds which pattern_def rows hit a lowercased text:
+
+    - literals: one Aho-Corasick pass over the text (pyahocorasick, or
+      _Automaton for large sets), else one `in` test per distinct literal
+    - regexes: a _RegexSet; ASCII text (the usual case) gets one built
+      without IGNORECASE wherever that doesn't change what matches
+    """
+
+    def __init__(self, patterns: List[Tuple[str, int, str, str, float]]):
+        literals: Dict[str, List[int]] = defaultdict(list)
+        unioned: List[Tuple[int, str]] = []
+        loose: List[Tuple[int, str]] = []
+
+        for i, (pattern, is_regex, *_rest) in enumerate(patterns):
+            if not is_regex:
+                literals[pattern.lower()].append(i)
+            elif _BACKREF.search(pattern):
+                loose.append((i, pattern))
+            else:
+                unioned.append((i, pattern))
+
+        # '' is a substring of every text but can't go in the automaton
+        self.always = literals.pop("", [])
+
+        self.automaton = None
+        self.literals = list(literals.items())
+        if ahocorasick is not None and self.literals:
+            self.automaton = ahocorasick.Automaton()
+        elif len(self.literals) >= _PY_AUTOMATON_MIN:
+            self.automaton = _Automaton()
+        if self.automaton is not None:
+            for lit, idxs in self.literals:
+                self.automaton.add_word(lit, tuple(idxs))
+            self.automaton.make_automaton()
+
+        self.regex = _RegexSet(unioned, loose, ascii_lower=False)
+        self.regex_ascii = _RegexSet(unioned, loose, ascii_lower=True)
+
+    def hits(self, t: str) -> List[int]:
+        """Indices of the patterns found in t, in pattern_def order."""
+        found = set(self.always)
+
+        if self.automaton is not None:
+            for _end, idxs in self.automaton.iter(t):
+                found.update(idxs)
+        else:
+            for lit, idxs in self.literals:
+                if lit in t:
+                    found.update(idxs)
+
+        (self.regex_ascii if t.isascii() else self.regex).add_hits(t, found)
+
+        return sorted(found)
+
+
+def _build_rules(conn: sqlite3.Connection):
+    """
+    _fetch_rules + _fetch_signal_rules, with patterns compiled into a
+    _PatternMatcher and every intent/tag name mapped to an index.
+
+    Returns (names, n_intents, matcher, text_rules, signal_rules):
+    - names: index -> name; intent_def rows come first (n_intents of
+      them), then pattern intents/tags, then signal_rule intents
+    - text_rules: parallel arrays over pattern_def rows
+      (intent_idx, w, tag_idx, entity_w), -1 where there is no name
+    - signal_rules: _fetch_signal_rules' buckets with intent_name
+      replaced by its index
+    """
+    # One read transaction: all four tables come from the same snapshot,
+    # even if an editor commits between the SELECTs.
+    conn.execute("BEGIN")
+    try:
+        intents, patterns, entities = _fetch_rules(conn)
+        signal_rules = _fetch_signal_rules(conn)
+    finally:
+        conn.execute("COMMIT")
+
+    name_idx: Dict[str, int] = {}
+    for name in intents:
+        name_idx.setdefault(name, len(name_idx))
+    n_intents = len(name_idx)
+
+    n = len(patterns)
+    rule_intent = np.full(n, -1, dtype=np.int64)
+    rule_w = np.zeros(n)
+    rule_tag = np.full(n, -1, dtype=np.int64)
+    rule_ew = np.zeros(n)
+    for i, (_p, _r, intent_name, entity_name, weight) in enumerate(patterns):
+        tag, ew = entities.get(entity_name, ('', 0.0)) if entity_name else ('', 0.0)
+        if intent_name:
+            rule_intent[i] = name_idx.setdefault(intent_name, len(name_idx))
+        rule_w[i] = float(weight or 0.0)
+        if tag:
+            rule_tag[i] = name_idx.setdefault(tag, len(name_idx))
+        rule_ew[i] = float(ew or 0.0)
+
+    signal_rules = {
+        sf: [
+            (rule_id, op, match, rule_val,
+             name_idx.setdefault(intent, len(name_idx)), w, min_c, urg)
+            for rule_id, op, match, rule_val, intent, w, min_c, urg in bucket
+        ]
+        for sf, bucket in signal_rules.items()
+    }
+
+    return (
+        tuple(name_idx), n_intents, _PatternMatcher(patterns),
+        (rule_intent, rule_w, rule_tag, rule_ew), signal_rules,
+    )
+
+
+# first-touch marker for entries that were never scored
+_UNSET = int(np.iinfo(np.int64).max)
+# urgency marker for intents no signal rule fired for
+_NO_URG = int(np.iinfo(np.int64).min)
+
+
+@dataclass(slots=True)
+class _Scratch:
+    """Score buffers for one thread's rule set, reset in place per call."""
+    text_scores: np.ndarray
+    text_first: np.ndarray
+    text_first_init: np.ndarray  # intent_def order, _UNSET elsewhere
+    scores: np.ndarray
+    first: np.ndarray
+    urgency: np.ndarray
+
+    @classmethod
+    def sized(cls, n: int, n_intents: int) -> "_Scratch":
+        first_init = np.full(n, _UNSET, dtype=np.int64)
+        first_init[:n_intents] = np.arange(n_intents)
+        return cls(
+            np.zeros(n), np.empty(n, dtype=np.int64), first_init,
+            np.zeros(n), np.empty(n, dtype=np.int64), np.empty(n, dtype=np.int64),
+        )
+
+    def reset(self) -> None:
+        self.text_scores.fill(0.0)
+        self.text_first[:] = self.text_first_init
+        self.scores.fill(0.0)
+        self.first.fill(_UNSET)
+        self.urgency.fill(_NO_URG)
+
+
+# Per thread: db_path -> [read-only connection, data_version, rules,
+# _Scratch sized for those rules].
+# data_version is per connection (it moves when *other* connections
+# commit), so the connection has to stay open for it to mean anything,
+# and the version it reports is only comparable with its own earlier
+# answers; hence the rules are cached next to the connection they were
+# read through.
+_CONN_TLS = threading.local()
+
+
+def _get_conn(db_path: str) -> list:
+    conns = getattr(_CONN_TLS, "conns", None)
+    if conns is None:
+        conns = _CONN_TLS.conns = {}
+
+    entry = conns.get(db_path)
+    if entry is None:
+        uri = "file:" + quote(os.path.abspath(db_path)) + "?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        conn.execute("PRAGMA query_only=1")
+        entry = conns[db_path] = [conn, None, None, None]
+    return entry
+
+
+def _rules(db_path: str):
+    """
+    (_build_rules output, _Scratch) for db_path on this thread; rules are
+    rebuilt only when the DB has changed.
+    """
+    entry = _get_conn(db_path)
+    conn = entry[0]
+
+    dv = conn.execute("PRAGMA data_version").fetchone()[0]
+    if entry[1] != dv:
+        rules = entry[2] = _build_rules(conn)
+        entry[3] = _Scratch.sized(len(rules[0]), rules[1])
+        entry[1] = dv
+    return entry[2], entry[3]
+
+
+@njit(cache=True)
+def _score_text(hits: np.ndarray,
+                rule_intent: np.ndarray, rule_w: np.ndarray,
+                rule_tag: np.ndarray, rule_ew: np.ndarray,
+                scores: np.ndarray, first: np.ndarray, seq: int) -> int:
+    """
+    Text scoring kernel: add each hit rule's weight to its intent and its
+    entity weight to its tag, in place. first[k] records when entry k was
+    first scored (seq counts up), which is what ties are broken on.
+
+    Only arrays and ints — no DB or regex work — so numba compiles it to
+    native code when installed. Returns the next seq.
+    """
+    for i in hits:
+        k = rule_intent[i]
+        if k >= 0:
+            scores[k] += rule_w[i]
+            if first[k] == _UNSET:
+                first[k] = seq
+                seq += 1
+
+        k = rule_tag[i]
+        if k >= 0:
+            scores[k] += rule_ew[i]
+            if first[k] == _UNSET:
+                first[k] = seq
+                seq += 1
+
+    return seq
+
+
+def _best(scores: np.ndarray, first: np.ndarray) -> int:
+    """
+    Index of the highest score among the entries that were scored, ties
+    going to the one scored first (as max() over an insertion-ordered
+    dict would). -1 if nothing was scored.
+    """
+    touched = first != _UNSET
+    if not touched.any():
+        return -1
+    masked = np.where(touched, scores, -np.inf)
+    best = int(masked.argmax())
+    cand = np.flatnonzero(masked == masked[best])
+    if len(cand) > 1:
+        best = int(cand[first[cand].argmin()])
+    return best
+
+
 def _confidence(raw: float) -> float:
     """
     Map a raw score into [0.4, 0.95].
     """
     conf = 0.5 + 0.15 * raw
-    return max(0.4, min(0.95, conf))
+    return 0.4 if conf < 0.4 else 0.95 if conf > 0.95 else conf
 
 
-def _score_signal_rules(conn: sqlite3.Connection, vision: VisionResult):
+def _score_signal_rules(signal_rules, names: Tuple[str, ...], vision: VisionResult,
+                        scores: np.ndarray, first: np.ndarray, urgency: np.ndarray,
+                        trace: bool = True):
     """
-    Apply signal_rule rows to the evidence in VisionResult.
+    Apply signal_rule rows (bucketed by _build_rules) to the evidence in
+    VisionResult. Each evidence item only visits the rules for its own
+    (source, feature).
+
+    Fills, over the name index (arrays arrive reset):
+      scores:  summed w*conf per intent
+      first:   order in which intents were first hit (_UNSET if never)
+      urgency: max urgency per intent (_NO_URG if never hit)
 
-    Returns:
-      scores:    dict[intent_name -> float]
-      urgencies: dict[intent_name -> list[int]]
-      trace:     list[str]  (human-readable matches)
+    Returns the trace: a list of ("signal_hit", ...) tuples (see
+    format_trace), or None if trace=False.
     """
     evidence: List[Evidence] = getattr(vision, "evidence", []) or []
 
-    rows = conn.execute("""
-        SELECT id, source, feature, operator, value, intent_name,
-               weight, min_conf, urgency
-        FROM signal_rule
-        WHERE enabled = 1
-        ORDER BY id
-    """).fetchall()
-
-    scores: Dict[str, float] = defaultdict(float)
-    urgencies: Dict[str, List[int]] = defaultdict(list)
-    trace: List[str] = []
+    seq = 0
+    lines: List[tuple] | None = [] if trace else None
 
     for ev in evidence:
         ev_source = ev.source
         ev_feature = ev.feature
+        bucket = signal_rules.get((ev_source, ev_feature))
+        if not bucket:
+            continue
+
         ev_val = str(ev.value).lower()
         ev_conf = float(ev.conf)
-        ev_obj = getattr(ev, "object_id", None)
+        ev_obj = getattr(ev, "object_id", None) if trace else None
 
-        for rule_id, source, feature, op, val, intent, weight, min_conf, urg in rows:
-            if source != ev_source or feature != ev_feature:
+        for rule_id, op, match, rule_val, intent, w, min_c, urg in bucket:
+            if ev_conf < min_c or not match(ev_val, rule_val):
                 continue
 
-            min_c = float(min_conf or 0.0)
-            if ev_conf < min_c:
-                continue
+            delta = w * ev_conf
+            scores[intent] += delta
+            if first[intent] == _UNSET:
+                first[intent] = seq
+                seq += 1
+            if urg > urgency[intent]:
+                urgency[intent] = urg
 
-            rule_val = str(val).lower()
-            matched = False
+            if lines is not None:
+                lines.append((
+                    "signal_hit", rule_id, names[intent], delta, w, ev_conf,
+                    urg, ev_source, ev_feature, ev_val, ev_obj, op, rule_val,
+                ))
 
-            if op == "equals":
-                matched = (ev_val == rule_val)
-            elif op == "contains":
-                matched = (rule_val in ev_val)
+    return lines
 
-            if not matched:
-                continue
 
-            w = float(weight or 1.0)
-            delta = w * ev_conf
-            scores[intent] += delta
-            urgencies[intent].append(int(urg or 10))
 
-            trace.append(
+def format_trace(entries: List[tuple]) -> List[str]:
+    """
+    Render Classified.trace entries as human-readable lines. Entries are
+    kept as raw tuples so classify doesn't pay for formatting nobody reads.
+    """
+    lines = []
+    for entry in entries:
+        if entry[0] == "signal_hit":
+            (_kind, rule_id, intent, delta, w, ev_conf, urg,
+             ev_source, ev_feature, ev_val, ev_obj, op, rule_val) = entry
+            lines.append(
                 f"[rule {rule_id}] {intent} +{delta:.2f} "
-                f"(w={w:.2f}*conf={ev_conf:.2f}, urg={int(urg or 10)}) "
+                f"(w={w:.2f}*conf={ev_conf:.2f}, urg={urg}) "
                 f"because ev(src={ev_source} feat={ev_feature} val={ev_val} obj={ev_obj}) {op} '{rule_val}'"
             )
+        else:
+            lines.append(repr(entry))
+    return lines
 
-    return scores, urgencies, trace
 
+# Hard-coded fallback urgency for text-only intents.
+# You can move this to intent_def if you want later.
+_TEXT_URGENCY = {
+    "neighbor_help": 20,
+    "technician_visit": 30,
+    "authority_urgent": 90,
+}
 
 
-def classify(text: str, vision: VisionResult, db_path: str | None = None) -> Classified:
+def classify(text: str, vision: VisionResult, db_path: str | None = None,
+             trace: bool = True) -> Classified:
     """
     Combine TEXT rules + multimodal EVIDENCE rules into a final intent.
 
     - Text rules come from: intent_def / pattern_def / entity_def
     - Vision/OCR/future fashion/audio rules come from: signal_rule
       acting on `vision.evidence`.
-    """
-    db_path = db_path or _default_db_path()
-    t = (text or "").lower()
-
-    scores: Dict[str, float] = defaultdict(float)
-    intent_urgencies: Dict[str, List[int]] = defaultdict(list)
-
-    # Hard-coded fallback urgency for text-only intents.
-    # You can move this to intent_def if you want later.
-    urgency_map = {
-        "neighbor_help": 20,
-        "technician_visit": 30,
-        "authority_urgent": 90,
-    }
-
-    with sqlite3.connect(db_path) as conn:
-        # 1) TEXT: pattern/entity scoring
-        intents, patterns, entities = _fetch_rules(conn)
 
-        text_raw_scores: Dict[str, float] = defaultdict(float)
-        for name in intents:
-            text_raw_scores[name] = 0.0
-
-        for pattern, is_regex, intent_name, entity_name, weight in patterns:
-            hit = False
-            if is_regex:
-                if re.search(pattern, t, flags=re.IGNORECASE):
-                    hit = True
-            else:
-                if pattern.lower() in t:
-                    hit = True
-            if not hit:
-                continue
-
-            w = float(weight or 0.0)
-
-            if intent_name:
-                text_raw_scores[intent_name] += w
-
-            if entity_name:
-                tag, ew = entities.get(entity_name, ('', 0.0))
-                if tag:
-                    text_raw_scores[tag] += float(ew or 0.0)
-
-        # fold best text intent (if any) into unified scores
-        if text_raw_scores:
-            best_text_intent = max(text_raw_scores, key=text_raw_scores.get)
-            raw = text_raw_scores[best_text_intent]
-            if raw > 0.0:
-                text_conf = _confidence(raw)
-                scores[best_text_intent] += text_conf
-                intent_urgencies[best_text_intent].append(
-                    urgency_map.get(best_text_intent, 10)
-                )
-
-        # 2) MULTIMODAL EVIDENCE: signal_rule over vision.evidence
-        trace: List[str] = []
+    trace=False skips recording which rules fired (Classified.trace is
+    then empty); format_trace turns the recorded entries into text.
+    """
+    rules, sc = _rules(db_path or _DEFAULT_DB_PATH)
+    return _classify_with_rules((text or "").lower(), vision, rules, sc, trace)
 
-        sig_scores, sig_urgencies, sig_trace  = _score_signal_rules(conn, vision)
-        trace.extend(sig_trace)
 
-        for intent_name, s in sig_scores.items():
-            scores[intent_name] += s
-            intent_urgencies[intent_name].extend(sig_urgencies[intent_name])
+def classify_batch(texts: List[str], visions: List[VisionResult],
+                   db_path: str | None = None, trace: bool = True) -> List[Classified]:
+    """
+    classify() over pairs of (text, vision), checking the rules once for
+    the whole batch (e.g. the OCR + ASR utterances of one ring).
+    """
+    rules, sc = _rules(db_path or _DEFAULT_DB_PATH)
+    return [
+        _classify_with_rules((text or "").lower(), vision, rules, sc, trace)
+        for text, vision in zip(texts, visions, strict=True)
+    ]
+
+
+def _classify_with_rules(t: str, vision: VisionResult, rules: tuple,
+                         sc: _Scratch, trace: bool) -> Classified:
+    """classify() for lowercased text t, given _rules() output."""
+    names, n_intents, matcher, text_rules, signal_rules = rules
+    sc.reset()
+
+    # 1) TEXT: pattern/entity scoring. intent_def names always take part
+    # (at 0.0), ahead of anything the hits add.
+    hits = np.array(matcher.hits(t), dtype=np.int64)
+    _score_text(hits, *text_rules, sc.text_scores, sc.text_first, n_intents)
+
+    # 2) MULTIMODAL EVIDENCE: signal_rule over vision.evidence
+    scores, first, urgency = sc.scores, sc.first, sc.urgency
+    lines = _score_signal_rules(
+        signal_rules, names, vision, scores, first, urgency, trace
+    )
+
+    # fold best text intent (if any) into unified scores, ahead of the
+    # signal intents for tie-breaking
+    best_text = _best(sc.text_scores, sc.text_first)
+    text_urgency = None
+    if best_text >= 0:
+        raw = float(sc.text_scores[best_text])
+        if raw > 0.0:
+            scores[best_text] += _confidence(raw)
+            first[best_text] = -1
+            text_urgency = _TEXT_URGENCY.get(names[best_text], 10)
 
     # 3) Final decision
-    if not scores:
+    best = _best(scores, first)
+    if best < 0:
         return Classified("unknown", 0.45, 10, trace=[])
 
-    best_intent = max(scores, key=scores.get)
-    total_score = scores[best_intent]
+    best_intent = names[best]
+    total_score = float(scores[best])
 
     # simple mapping of total_score to confidence
     #  - 1 strong signal → ~0.75
     #  - multiple agreeing signals → up towards 0.95
-    conf = 0.5 + 0.25 * min(total_score, 2.0)
-    conf = max(0.4, min(0.95, conf))
+    conf = 0.5 + 0.25 * (2.0 if total_score > 2.0 else total_score)
+    conf = 0.4 if conf < 0.4 else 0.95 if conf > 0.95 else conf
 
-    urg_list = intent_urgencies.get(best_intent) or [10]
-    urgency = max(urg_list)
+    urg = int(urgency[best])
+    if best == best_text and text_urgency is not None:
+        urg = max(urg, text_urgency)
 
-    return Classified(best_intent, conf, urgency, trace=trace)
+    return Classified(best_intent, conf, urg, trace=lines or [])
@@ -1,8 +1,11 @@
+import os
 from dataclasses import dataclass, field
 from typing import List, Tuple, Optional
 
+import numpy as np
 
-@dataclass
+
+@dataclass(slots=True)
 class Detection:
     # ------------------------------------------------------------------
     # cls
@@ -46,8 +49,8 @@ class Detection:
     # ------------------------------------------------------------------
     # color
     # ------------------------------------------------------------------
-    # The dominant color of the region, determined by k-means on the
-    # cropped bounding box.
+    # The dominant color of the region: the most common CSS color bucket
+    # among the cropped bounding box's pixels.
     #
     # Examples:
     #   - "black"
@@ -59,7 +62,39 @@ class Detection:
     color: str
 
 
-@dataclass
+# ----------------------------------------------------------------------
+# Detection recycling (opt-in with ECHO_POOL=1)
+# ----------------------------------------------------------------------
+# Detections released by a caller that is done with them are handed out
+# again by acquire_detection instead of allocating new ones.
+POOL_DETECTIONS = os.environ.get("ECHO_POOL") == "1"
+_DET_POOL_MAX = 256
+_det_pool: List[Detection] = []
+
+
+def acquire_detection(cls: str, conf: float,
+                      box: Tuple[int, int, int, int], color: str) -> Detection:
+    if POOL_DETECTIONS:
+        try:
+            d = _det_pool.pop()
+        except IndexError:  # empty (or emptied by another thread)
+            pass
+        else:
+            d.cls, d.conf, d.box, d.color = cls, conf, box, color
+            return d
+    return Detection(cls=cls, conf=conf, box=box, color=color)
+
+
+def release_detections(dets: List[Detection]) -> None:
+    """
+    Return Detections to the pool. Only for callers that own them outright:
+    a released Detection gets overwritten by the next acquire.
+    """
+    if POOL_DETECTIONS and len(_det_pool) < _DET_POOL_MAX:
+        _det_pool.extend(dets)
+
+
+@dataclass(slots=True)
 class Evidence:
 
     # ---------------------------------------------------------------------
@@ -137,7 +172,7 @@ class Evidence:
 
     object_id: int | None = None
 
-@dataclass
+@dataclass(slots=True)
 class SceneObject:
     # ------------------------------------------------------------------
     # object_id
@@ -159,22 +194,6 @@ class SceneObject:
     #   object_id = 1 → vehicle
     object_id: int
 
-
-    # ------------------------------------------------------------------
-    # parent_id
-    # ------------------------------------------------------------------
-    # Points to the ID of another SceneObject that is this object's parent.
-    #
-    # IMPORTANT:
-    #   - These IDs do NOT persist across events.
-    #   - They exist only to group evidence belonging to the
-    #     same object within a single perception pass.
-    #
-    # Example:
-    #   object_id = 1 → self (license plate)
-    #   parent_id = 1 → parent (vehicle)
-    parent_id: int | None = None
-
     # ------------------------------------------------------------------
     # label
     # ------------------------------------------------------------------
@@ -262,7 +281,7 @@ class SceneObject:
     evidence: list[Evidence] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class VisionResult:
     # ------------------------------------------------------------------
     # snapshot_path
@@ -273,7 +292,9 @@ class VisionResult:
     #   - debugging
     #   - showing images in a UI
     #   - logging
-    snapshot_path: str
+    #
+    # None when a live frame produced no detections (it isn't saved).
+    snapshot_path: Optional[str]
 
     # ------------------------------------------------------------------
     # detections
@@ -362,4 +383,21 @@ class VisionResult:
     #  SceneObject( object_id=0, label="person", props={"color": "brown"}, evidence=[...]),
     #  SceneObject( object_id=1, label="vehicle", props={"color": "black"}, evidence=[...]),
     # ]   
-    objects: List[SceneObject] = field(default_factory=list)
\ No newline at end of file
+    objects: List[SceneObject] = field(default_factory=list)
+
+    # ------------------------------------------------------------------
+    # Detection arrays (structure-of-arrays view)
+    # ------------------------------------------------------------------
+    # The same detections as parallel numpy arrays, row i == detections[i]:
+    #   cls_arr    → (N,)   str      semantic class
+    #   conf_arr   → (N,)   float32  YOLO confidence
+    #   box_arr    → (N, 4) int32    x1, y1, x2, y2
+    #   color_arr  → (N,)   str      dominant color name
+    #
+    # Lets scene-level checks run as one vectorized compare, e.g.
+    #   (vr.cls_arr == "person").any()
+    # instead of walking the Detection objects. None when not built.
+    cls_arr: Optional[np.ndarray] = None
+    conf_arr: Optional[np.ndarray] = None
+    box_arr: Optional[np.ndarray] = None
+    color_arr: Optional[np.ndarray] = None
@@ -1,16 +1,64 @@
-import requests, sqlite3
+import json, requests, sqlite3, threading, time
+from concurrent.futures import ThreadPoolExecutor, wait
+from requests.adapters import HTTPAdapter
+
+SQL_TOKEN = "SELECT value FROM settings WHERE key='telegram_token'"
+SQL_TARGETS = "SELECT target FROM notifiers WHERE kind='telegram' AND priority IN (?, 'normal')"
+
+TOKEN_TTL = 60.0      # seconds a fetched telegram token is reused
+SEND_DEADLINE = 6.0   # seconds send() waits for the whole fan-out
+
+_local = threading.local()  # per-thread: db_path -> connection
+_token_cache = {}           # db_path -> (token row, expires_at)
+
+# One keep-alive session: the TLS connection to api.telegram.org is
+# reused across targets and notifications instead of redone per post.
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+# Targets are posted to concurrently, so one slow chat doesn't hold up
+# the rest (the threads spend their time waiting on the network).
+_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="piper")
+
+def _get_conn(db_path):
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(db_path)
+    if conn is None:
+        conn = conns[db_path] = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+def _get_token(conn, db_path):
+    tok, expires_at = _token_cache.get(db_path, (None, 0.0))
+    now = time.monotonic()
+    if now >= expires_at:
+        tok = conn.execute(SQL_TOKEN).fetchone()
+        _token_cache[db_path] = (tok, now + TOKEN_TTL)
+    return tok
+
+_JSON = {"Content-Type": "application/json"}
+
+def _post(url, body):
+    try:
+        _session.post(url, data=body, headers=_JSON, timeout=5)
+    except Exception:
+        pass
 
 def send(message:str, priority="normal", db_path="data/doorbell.db"):
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    tok = cur.execute("SELECT value FROM settings WHERE key='telegram_token'").fetchone()
-    rows = cur.execute("SELECT target FROM notifiers WHERE kind='telegram' AND priority IN (?, 'normal')", (priority,)).fetchall()
-    conn.close()
+    conn = _get_conn(db_path)
+    tok = _get_token(conn, db_path)
     if not tok: return
-    token = tok[0]
-    for (chat_id,) in rows:
-        url = f"https://api.telegram.org/bot{token}/sendMessage"
-        try:
-            requests.post(url, json={"chat_id": chat_id, "text": message}, timeout=5)
-        except Exception:
-            pass
+    rows = conn.execute(SQL_TARGETS, (priority,)).fetchall()
+    url = f"https://api.telegram.org/bot{tok[0]}/sendMessage"
+    # The message is JSON-encoded once; each target only splices in its
+    # chat_id. Every post gets its own bytes (the posts run concurrently,
+    # so there is no shared payload to mutate).
+    text = json.dumps(message)
+    futures = [
+        _pool.submit(_post, url, f'{{"chat_id": {json.dumps(chat_id)}, "text": {text}}}'.encode())
+        for (chat_id,) in rows
+    ]
+    wait(futures, timeout=SEND_DEADLINE)
@@ -1,47 +1,85 @@
 # packages/perception/ocr.py
-import easyocr
+import string
+from functools import lru_cache
 import numpy as np
 from typing import List
 from packages.common.types import Detection
 
-_reader = None
+# detection classes whose crops are likely to carry text
+_OCR_CLS = frozenset({"person", "vehicle", "package"})
 
+# drops ASCII punctuation, so "UPS." and "ups" become the same token
+_STRIP_PUNCT = str.maketrans("", "", string.punctuation)
+
+@lru_cache(maxsize=1)
 def _get_reader():
-    global _reader
-    if _reader is None:
-        # GPU=False is safer for a small box / doorbell device
-        _reader = easyocr.Reader(['en'], gpu=False)
-    return _reader
+    # imported here: pulls in torch, which only OCR'd frames should pay for
+    import easyocr
+    # GPU=False is safer for a small box / doorbell device;
+    # quantize=True runs the recognizer with dynamic int8 weights on CPU
+    return easyocr.Reader(['en'], gpu=False, quantize=True)
+
+def _pad_batch(crops: List[np.ndarray]) -> np.ndarray:
+    """
+    Stack crops into one (N, H, W, 3) uint8 batch, zero-padded at the
+    bottom/right to the largest crop. Padding rather than resizing keeps
+    the text at the scale the detector would have seen per crop.
+    """
+    h = max(c.shape[0] for c in crops)
+    w = max(c.shape[1] for c in crops)
+    batch = np.zeros((len(crops), h, w, 3), dtype=np.uint8)
+    for i, c in enumerate(crops):
+        batch[i, :c.shape[0], :c.shape[1]] = c
+    return batch
+
+
+def _read_crops(reader, crops: List[np.ndarray]) -> List[List[str]]:
+    """
+    OCR every crop in one readtext_batched call (one detector and one
+    recognizer pass for the whole frame). Falls back to a readtext call
+    per crop if the batch fails, skipping crops OCR chokes on.
+    """
+    try:
+        return reader.readtext_batched(_pad_batch(crops), detail=0)
+    except Exception:
+        pass
+
+    results = []
+    for crop in crops:
+        # detail=0 → just text strings
+        try:
+            results.append(reader.readtext(crop, detail=0))
+        except Exception as e:
+            # don't kill vision if OCR chokes on a weird crop
+            continue
+    return results
+
 
 def extract_ocr_tokens(frame: np.ndarray, detections: List[Detection]) -> list[str]:
     """
     Run OCR on relevant regions (vehicles, packages, uniforms, shirts).
-    Returns a de-duplicated list of lowercase tokens.
+    Returns a de-duplicated list of lowercase tokens, in the order OCR
+    first produced them.
     """
-    reader = _get_reader()
-    tokens: set[str] = set()
-
-    # Simple first pass: run OCR on each detection crop that's likely to have text
+    # Only crops that are likely to have text
+    crops = []
     for det in detections:
-        if det.cls not in {"person", "vehicle", "package"}:
+        if det.cls not in _OCR_CLS:
             continue
 
         x1, y1, x2, y2 = det.box
         crop = frame[y1:y2, x1:x2]
         if crop.size == 0:
             continue
+        crops.append(crop)
 
-        # detail=0 → just text strings
-        try:
-            results = reader.readtext(crop, detail=0)
-        except Exception as e:
-            # don't kill vision if OCR chokes on a weird crop
-            continue
+    if not crops:
+        return []
 
+    # dict as an insertion-ordered set: dedup in first-seen order, no sort
+    tokens: dict[str, None] = {}
+    for results in _read_crops(_get_reader(), crops):
         for text in results:
-            for tok in str(text).split():
-                tok = tok.strip().lower()
-                if tok:
-                    tokens.add(tok)
+            tokens.update(dict.fromkeys(str(text).translate(_STRIP_PUNCT).lower().split()))
 
-    return sorted(tokens)
+    return list(tokens)
@@ -1,18 +1,67 @@
 # packages/perception/vision.py
+import ast
 import sqlite3
 import os, time
-from typing import List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import numpy as np
 from ultralytics import YOLO
 import cv2
 import sys, os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
-from packages.common.types import Detection, Evidence, VisionResult, SceneObject
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, _PROJECT_ROOT)
+from packages.common.types import (
+    Detection, Evidence, VisionResult, SceneObject, acquire_detection,
+)
 from .ocr import extract_ocr_tokens
 
-_MODEL = YOLO("yolov8n.pt")
 MODEL_NAME = "yolov8n"
 
+# Model files are looked up in the project root, not the working directory.
+# FP16 OpenVINO export of the same weights. Build it once with
+#   YOLO("yolov8n.pt").export(format="openvino", half=True)
+# and it is used instead of the fp32 .pt when present.
+_MODEL_PT = os.path.join(_PROJECT_ROOT, "yolov8n.pt")
+_MODEL_OPENVINO = os.path.join(_PROJECT_ROOT, "yolov8n_openvino_model")
+
+# The same network exported to ONNX with NMS inside the graph:
+#   YOLO("yolov8n.pt").export(format="onnx", nms=True, simplify=True, opset=17)
+# When it exists and onnxruntime is installed, inference goes through
+# onnxruntime instead of ultralytics/torch.
+_MODEL_ONNX = os.path.join(_PROJECT_ROOT, "yolov8n.onnx")
+_IMGSZ = 640
+_CONF = 0.25
+
+# per-thread letterbox canvas + input blob for the onnxruntime path
+_lb_local = threading.local()
+
+# Per-detection color estimation fans out here: the resize and matmul
+# release the GIL, so crops from one frame are processed side by side.
+_COLOR_POOL = ThreadPoolExecutor(max_workers=os.cpu_count() or 2,
+                                 thread_name_prefix="color")
+
+# (db, model_name) -> (fetched_at, vision_class_map); see _vision_map
+VISION_MAP_TTL = 30.0
+_MAP_CACHE: dict[tuple[str, str], tuple[float, dict[str, str]]] = {}
+
+# rtsp url -> open VideoCapture, kept across calls so each snapshot is a
+# grab/retrieve instead of a fresh stream connect. Each url has its own
+# lock, held across the (possibly blocking) read, so a stalled camera
+# only holds up callers of that camera; _cap_locks_guard is held just
+# for the lock lookup.
+_cap_cache: dict[str, cv2.VideoCapture] = {}
+_cap_locks: dict[str, threading.Lock] = {}
+_cap_locks_guard = threading.Lock()
+_DRAIN_MAX = 30          # max buffered frames skipped per read
+_LIVE_GRAB_SEC = 0.005   # a grab slower than this waited on the camera
+
+# source -> (last frame, its YOLO result). A frame from the same live
+# stream that is pixel-for-pixel identical to the previous one (a frozen
+# or idle camera) reuses that result instead of re-running YOLO. Only an
+# exact match counts: a near-duplicate may hold a small new object.
+_last_infer: dict[str, tuple[np.ndarray, tuple]] = {}
+
 POSITIVE_CLASSES = {
     "person": "person",
     "microwave": "package",
@@ -39,12 +88,13 @@ CSS_COLORS = {
 }
 
 
-def _derive_flags(labels: List[str]) -> dict:
+def _derive_flags(cls_arr: np.ndarray) -> dict:
+    # one vectorized compare per flag over the semantic class column
     return {
-        "person_present": any(l == "person" for l in labels),
-        "package_box": any(l == "package" for l in labels),
-        "vehicle_present": any(l == "vehicle" for l in labels),
-        "dog_present": any(l == "dog" for l in labels),
+        "person_present": bool((cls_arr == "person").any()),
+        "package_box": bool((cls_arr == "package").any()),
+        "vehicle_present": bool((cls_arr == "vehicle").any()),
+        "dog_present": bool((cls_arr == "dog").any()),
         "uniform": None,  # placeholder
     }
 
@@ -58,201 +108,422 @@ def _fetch_vision_map(conn, model_name: str) -> dict[str, str]:
     return {raw: sem for (raw, sem) in rows}
 
 
-def _dominant_color_rgb(crop: np.ndarray, k: int = 3) -> np.ndarray:
+def _vision_map(db: str, model_name: str) -> dict[str, str]:
+    """
+    _fetch_vision_map, memoized per (db, model_name) for VISION_MAP_TTL
+    seconds. The class map is edited by hand, not per frame, so most
+    frames never touch SQLite.
+    """
+    key = (db, model_name)
+    hit = _MAP_CACHE.get(key)
+    now = time.monotonic()
+    if hit is not None and now - hit[0] < VISION_MAP_TTL:
+        return hit[1]
+
+    conn = sqlite3.connect(db)
+    try:
+        vmap = _fetch_vision_map(conn, model_name)
+    finally:
+        conn.close()
+    _MAP_CACHE[key] = (now, vmap)
+    return vmap
+
+
+def invalidate_vision_cache() -> None:
+    """Drop memoized class maps; call after editing vision_class_map."""
+    _MAP_CACHE.clear()
+
+
+# CSS_COLORS as a (10, 3) BGR palette (frames are BGR) plus the squared
+# norm of each entry, for the nearest-color step in _dominant_color_name.
+_CSS_NAMES = list(CSS_COLORS)
+_CSS_BGR = np.array([rgb[::-1] for rgb in CSS_COLORS.values()], dtype=np.float32)
+_CSS_SQ = (_CSS_BGR * _CSS_BGR).sum(axis=1)
+_SWATCH = (32, 32)  # crops larger than this are resized down before bucketing
+
+
+def _dominant_color_name(crop: np.ndarray) -> str:
+    """
+    Most common CSS_COLORS bucket among the crop's pixels.
+    Each pixel is snapped to its nearest palette color, then the buckets
+    are counted, so there is no clustering step.
+    """
     if crop is None or crop.size == 0:
-        return np.array([0.0, 0.0, 0.0], dtype=np.float32)
+        return "black"
+
+    # Area-average big crops down to a fixed swatch: the work is then the
+    # same for a 4K vehicle box as for a distant person.
+    h, w = crop.shape[:2]
+    if h * w > _SWATCH[0] * _SWATCH[1]:
+        crop = cv2.resize(crop, _SWATCH, interpolation=cv2.INTER_AREA)
 
     pixels = crop.reshape(-1, 3).astype(np.float32)
 
-    if pixels.shape[0] > 5000:
-        idx = np.random.choice(pixels.shape[0], 5000, replace=False)
-        pixels = pixels[idx]
+    # |p - c|^2 = |p|^2 - 2 p.c + |c|^2; |p|^2 is the same for every c
+    dist = _CSS_SQ - 2.0 * (pixels @ _CSS_BGR.T)
+    counts = np.bincount(dist.argmin(axis=1), minlength=len(_CSS_NAMES))
+    return _CSS_NAMES[int(counts.argmax())]
+
+
+@lru_cache(maxsize=8)
+def _decode(path: str, mtime: float) -> np.ndarray | None:
+    """
+    Decode a still image once per (path, mtime).
+    The returned array is shared between calls — treat it as read-only.
+    """
+    return cv2.imread(path)
+
+
+def _open_capture(rtsp: str) -> cv2.VideoCapture:
+    cap = cv2.VideoCapture(rtsp, cv2.CAP_FFMPEG)
+    # honored by some backends; FFmpeg ignores it, see _grab_latest
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+
+def _grab_latest(cap: cv2.VideoCapture, drain: bool) -> np.ndarray | None:
+    """
+    Newest frame from cap, or None if the stream is dead.
+    With drain=True (a capture that sat idle between calls), frames that
+    queued up meanwhile are skipped: they come back without waiting, so
+    grab until one has to wait on the camera, i.e. we're at the live edge.
+    """
+    for _ in range(_DRAIN_MAX if drain else 1):
+        t = time.monotonic()
+        if not cap.grab():
+            return None
+        if time.monotonic() - t > _LIVE_GRAB_SEC:
+            break
+    ok, frame = cap.retrieve()
+    return frame if ok else None
+
+
+def _cap_lock(rtsp: str) -> threading.Lock:
+    with _cap_locks_guard:
+        lock = _cap_locks.get(rtsp)
+        if lock is None:
+            lock = _cap_locks[rtsp] = threading.Lock()
+    return lock
+
+
+def _read_stream(rtsp: str) -> np.ndarray:
+    with _cap_lock(rtsp):
+        cap = _cap_cache.get(rtsp)
+        cached = cap is not None and cap.isOpened()
+        if not cached:
+            cap = _cap_cache[rtsp] = _open_capture(rtsp)
+
+        frame = _grab_latest(cap, drain=cached)
+        if frame is None and cached:
+            # the cached session went stale (e.g. RTSP timeout between
+            # rings): reconnect once before giving up
+            cap.release()
+            cap = _cap_cache[rtsp] = _open_capture(rtsp)
+            frame = _grab_latest(cap, drain=False)
+        if frame is None:
+            # drop it so the next call reconnects
+            cap.release()
+            _cap_cache.pop(rtsp, None)
+            raise RuntimeError("Failed to read from camera")
+    return frame
+
+
+@lru_cache(maxsize=1)
+def _get_model() -> YOLO:
+    """Load the detector on first use (not at import) and keep it."""
+    if os.path.isdir(_MODEL_OPENVINO):
+        return YOLO(_MODEL_OPENVINO, task="detect")
+    return YOLO(_MODEL_PT)
+
+
+@lru_cache(maxsize=1)
+def _get_session():
+    """
+    (session, input name, class names) for _MODEL_ONNX, or None when the
+    export or onnxruntime is missing.
+    """
+    if not os.path.isfile(_MODEL_ONNX):
+        return None
+    try:
+        import onnxruntime as ort
+    except ImportError:
+        return None
+    available = ort.get_available_providers()
+    providers = [p for p in ("OpenVINOExecutionProvider", "CPUExecutionProvider")
+                 if p in available]
+    sess = ort.InferenceSession(_MODEL_ONNX, providers=providers)
+    names = ast.literal_eval(sess.get_modelmeta().custom_metadata_map["names"])
+    return sess, sess.get_inputs()[0].name, names
+
+
+def _letterbox(frame: np.ndarray) -> tuple[np.ndarray, float, int, int]:
+    """
+    Resize frame (keeping aspect) into the middle of a gray _IMGSZ square
+    and write it as a (1, 3, S, S) RGB float blob in [0, 1] into this
+    thread's reusable buffer. Returns the blob plus the scale and x/y
+    offsets needed to map boxes back onto the frame.
+    """
+    canvas = getattr(_lb_local, "canvas", None)
+    if canvas is None:
+        canvas = _lb_local.canvas = np.empty((_IMGSZ, _IMGSZ, 3), np.uint8)
+        _lb_local.blob = np.empty((1, 3, _IMGSZ, _IMGSZ), np.float32)
+    blob = _lb_local.blob
+
+    h, w = frame.shape[:2]
+    r = min(_IMGSZ / h, _IMGSZ / w)
+    nw, nh = round(w * r), round(h * r)
+    left, top = (_IMGSZ - nw) // 2, (_IMGSZ - nh) // 2
 
-    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 10, 1.0)
-    _ret, labels, centers = cv2.kmeans(
-        pixels, k, None, criteria, 5, cv2.KMEANS_RANDOM_CENTERS
+    canvas.fill(114)
+    canvas[top:top + nh, left:left + nw] = cv2.resize(
+        frame, (nw, nh), interpolation=cv2.INTER_LINEAR
     )
-    counts = np.bincount(labels.flatten())
-    dom_bgr = centers[np.argmax(counts)]
-    dom_rgb = dom_bgr[::-1]
-    return dom_rgb
+    # HWC BGR uint8 -> CHW RGB float
+    np.multiply(canvas[..., ::-1].transpose(2, 0, 1), 1 / 255,
+                out=blob[0], dtype=np.float32)
+    return blob, r, left, top
+
+
+def _run_onnx(session, frame: np.ndarray) -> np.ndarray:
+    sess, input_name, _names = session
+    blob, r, left, top = _letterbox(frame)
+    out = sess.run(None, {input_name: blob})[0][0]  # (max_det, 6), already NMS'd
+    out = out[out[:, 4] >= _CONF]
+    out[:, [0, 2]] -= left
+    out[:, [1, 3]] -= top
+    out[:, :4] /= r
+    return out
+
+
+def _infer(frame: np.ndarray, source: str | None = None) -> tuple[np.ndarray, dict]:
+    """
+    Detect on a BGR frame. Returns (arr, names): arr is (N, 6) float32
+    rows of x1, y1, x2, y2, conf, cls in frame pixels, names maps the
+    raw class id to its YOLO name.
+    source names the live stream the frame came from; only then is the
+    previous result reused, and only for an identical frame.
+    """
+    if source is not None:
+        last = _last_infer.get(source)
+        if last is not None and np.array_equal(last[0], frame):
+            return last[1]
+
+    session = _get_session()
+    if session is not None:
+        out = (_run_onnx(session, frame), session[2])
+    else:
+        res = _get_model()(frame, imgsz=_IMGSZ, conf=_CONF, iou=0.45, verbose=False)[0]
+        # boxes.data is already (N, 6) x1, y1, x2, y2, conf, cls: one
+        # device->host copy instead of one per column
+        out = (res.boxes.data.cpu().numpy(), res.names)
+
+    if source is not None:
+        _last_infer[source] = (frame, out)
+    return out
 
 
-def _closest_color_name(rgb: np.ndarray) -> str:
-    r, g, b = rgb
-    best_name, best_dist = "unknown", float("inf")
-    for name, (cr, cg, cb) in CSS_COLORS.items():
-        dist = (cr - r) ** 2 + (cg - g) ** 2 + (cb - b) ** 2
-        if dist < best_dist:
-            best_name, best_dist = name, dist
-    return best_name
+def _annotate(frame: np.ndarray, arr: np.ndarray, names: dict) -> np.ndarray:
+    img = frame.copy()
+    for x1, y1, x2, y2, score, c in arr:
+        p1, p2 = (int(x1), int(y1)), (int(x2), int(y2))
+        cv2.rectangle(img, p1, p2, (0, 255, 0), 2)
+        cv2.putText(img, f"{names[int(c)]} {score:.2f}", (p1[0], max(p1[1] - 4, 10)),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
+    return img
+
+
+def _snapshot_path() -> str:
+    return f"/tmp/echo_snap_{int(time.time())}.jpg"
+
+
+def _save_snapshot(frame: np.ndarray, snap_path: str) -> None:
+    # q80: visually the same as the default 95, noticeably smaller/faster
+    cv2.imwrite(snap_path, frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
 
 
 def snapshot_and_detect(db: str, rtsp: str,
                         debug: bool = True,
                         enable_ocr: bool = True) -> VisionResult:
-    import cv2, time
-    from packages.common.types import Detection, VisionResult
-
     # 1) Grab frame or image
     if rtsp.lower().endswith((".jpg", ".jpeg", ".png")):
-        frame = cv2.imread(rtsp)
+        try:
+            frame = _decode(rtsp, os.path.getmtime(rtsp))
+        except OSError:
+            frame = None
         if frame is None:
             raise RuntimeError(f"Failed to read test image: {rtsp}")
         snap_path = rtsp
+        source = None  # still image: never reuse another image's boxes
     else:
-        cap = cv2.VideoCapture(rtsp)
-        ok, frame = cap.read()
-        cap.release()
-        if not ok:
-            raise RuntimeError("Failed to read from camera")
-        ts = int(time.time())
-        snap_path = f"/tmp/echo_snap_{ts}.jpg"
-        cv2.imwrite(snap_path, frame)
+        frame = _read_stream(rtsp)
+        snap_path = None
+        source = rtsp
+
+    return detect_frame(db, frame, snap_path, debug=debug, enable_ocr=enable_ocr,
+                        source=source)
+
+
+def detect_frame(db: str, frame: np.ndarray,
+                 snap_path: str | None = None,
+                 debug: bool = True,
+                 enable_ocr: bool = True,
+                 source: str | None = None) -> VisionResult:
+    """
+    Run detection on an already-decoded BGR frame.
+    If snap_path is None the frame is saved to /tmp, but only when it
+    produced at least one detection; otherwise snapshot_path is None.
+    source: the live stream the frame was read from, if any (enables
+    reusing the previous result for an identical frame). The frame must
+    not be modified afterwards.
+    """
+    save_snapshot = snap_path is None
+    if save_snapshot:
+        snap_path = _snapshot_path()
 
     # 2) YOLO
-    res = _MODEL(frame, imgsz=640, conf=0.25, iou=0.45, verbose=False)[0]
+    arr, names = _infer(frame, source)
     h, w = frame.shape[:2]
 
-    with sqlite3.connect(db) as conn:
-        positive_classes = _fetch_vision_map(conn, MODEL_NAME)
-        if not positive_classes:
-            positive_classes = POSITIVE_CLASSES
+    positive_classes = _vision_map(db, MODEL_NAME)
+    if not positive_classes:
+        positive_classes = POSITIVE_CLASSES
+
+    # Debug raw detections
+    if debug:
+        print("\n[YOLO RAW DETECTIONS]")
+        for x1, y1, x2, y2, score, cls_i in arr:
+            name = names[int(cls_i)]
+            print(f"{name:>14}  conf={float(score):.3f}  "
+                  f"box=({int(x1)},{int(y1)},{int(x2)},{int(y2)})")
+        try:
+            annotated = _annotate(frame, arr, names)
+            dbg_path = snap_path.rsplit(".", 1)[0] + "_annotated.jpg"
+            cv2.imwrite(dbg_path, annotated)
+            print(f"[YOLO] Wrote annotated image → {dbg_path}")
+        except Exception as e:
+            print("[YOLO] Could not write annotated image:", e)
+
+    # 3) Build Detection list
+    # raw class id -> semantic class ("" = not one we care about), so
+    # mapping and filtering are one gather + compare over all rows
+    lut = np.array([positive_classes.get(names[i], "") for i in range(len(names))])
+    cls_all = lut[arr[:, 5].astype(np.intp)]
+    keep = cls_all != ""
+
+    cls_arr = cls_all[keep]
+    conf_arr = arr[keep, 4].astype(np.float32)
+    box_arr = arr[keep, :4].astype(np.int32)
+    np.clip(box_arr[:, 0], 0, w - 1, out=box_arr[:, 0])
+    np.clip(box_arr[:, 1], 0, h - 1, out=box_arr[:, 1])
+    np.clip(box_arr[:, 2], 0, w, out=box_arr[:, 2])
+    np.clip(box_arr[:, 3], 0, h, out=box_arr[:, 3])
+
+    boxes = box_arr.tolist()
+    crops = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in boxes]
+    if len(crops) > 1:
+        colors = list(_COLOR_POOL.map(_dominant_color_name, crops))
+    else:
+        colors = [_dominant_color_name(c) for c in crops]
+
+    dets: list[Detection] = []
 
-        # Debug raw detections
+    for mapped, score, (x1, y1, x2, y2), color_name in zip(
+        cls_arr.tolist(), conf_arr.tolist(), boxes, colors
+    ):
         if debug:
-            print("\n[YOLO RAW DETECTIONS]")
-            for box, cls_i, score in zip(
-                res.boxes.xyxy.cpu().numpy(),
-                res.boxes.cls.cpu().numpy(),
-                res.boxes.conf.cpu().numpy(),
-            ):
-                name = res.names[int(cls_i)]
-                x1, y1, x2, y2 = [int(v) for v in box.tolist()]
-                print(f"{name:>14}  conf={float(score):.3f}  box=({x1},{y1},{x2},{y2})")
-            try:
-                annotated = res.plot()
-                dbg_path = snap_path.rsplit(".", 1)[0] + "_annotated.jpg"
-                cv2.imwrite(dbg_path, annotated)
-                print(f"[YOLO] Wrote annotated image → {dbg_path}")
-            except Exception as e:
-                print("[YOLO] Could not write annotated image:", e)
-
-        # 3) Build Detection list
-        dets: list[Detection] = []
-        labels_for_flags: list[str] = []
-
-        for b, c, score in zip(
-            res.boxes.xyxy.cpu().numpy(),
-            res.boxes.cls.cpu().numpy(),
-            res.boxes.conf.cpu().numpy(),
-        ):
-            cls_name = res.names[int(c)]
-            mapped = positive_classes.get(cls_name)
-            if not mapped:
-                continue
-
-            x1, y1, x2, y2 = map(int, b.tolist())
-            x1 = max(0, min(x1, w - 1))
-            x2 = max(0, min(x2, w))
-            y1 = max(0, min(y1, h - 1))
-            y2 = max(0, min(y2, h))
-
-            crop = frame[y1:y2, x1:x2]
-            dom_rgb = _dominant_color_rgb(crop)
-            color_name = _closest_color_name(dom_rgb)
-
-            if debug:
-                print(
-                    f"  -> mapped={mapped}, color={color_name}, "
-                    f"rgb={dom_rgb.astype(int).tolist()}"
-                )
+            print(f"  -> mapped={mapped}, color={color_name}")
+
+        dets.append(acquire_detection(mapped, score, (x1, y1, x2, y2), color_name))
+
+    # Idle frames are never written; positive ones are, after the fact
+    if save_snapshot:
+        if dets:
+            _save_snapshot(frame, snap_path)
+        else:
+            snap_path = None
+
+    # cls_arr / conf_arr / box_arr above are already row-aligned with dets
+    color_arr = np.array([d.color for d in dets], dtype=str)
+
+    flags = _derive_flags(cls_arr)
+
+    vr = VisionResult(
+        snapshot_path=snap_path,
+        detections=dets,
+        person_present=flags["person_present"],
+        package_box=flags["package_box"],
+        vehicle_present=flags["vehicle_present"],
+        dog_present=flags["dog_present"],
+        uniform=flags["uniform"],
+        cls_arr=cls_arr,
+        conf_arr=conf_arr,
+        box_arr=box_arr,
+        color_arr=color_arr,
+    )
 
-            dets.append(
-                Detection(
-                    cls=mapped,
-                    conf=float(score),
-                    box=(x1, y1, x2, y2),
-                    color=color_name,
-                )
+    # 4) Build SceneObjects and object-level evidence
+    scene_objects: list[SceneObject] = []
+    for idx, det in enumerate(dets):
+        # rough entity hint
+        ent = det.cls if det.cls in ("person", "vehicle", "dog", "package") else None
+
+        obj = SceneObject(
+            object_id=idx,
+            label=det.cls,
+            parent_id=None,
+        )
+        obj.props["color"] = det.color
+
+        # evidence: class + color
+        obj.evidence.append(
+            Evidence(
+                source="vision",
+                feature="class",
+                value=det.cls.lower(),
+                conf=det.conf,
+            )
+        )
+        obj.evidence.append(
+            Evidence(
+                source="vision",
+                feature="color",
+                value=det.color.lower(),
+                conf=0.6,
             )
-            labels_for_flags.append(mapped)
-
-        flags = _derive_flags(labels_for_flags)
-
-        vr = VisionResult(
-            snapshot_path=snap_path,
-            detections=dets,
-            person_present=flags["person_present"],
-            package_box=flags["package_box"],
-            vehicle_present=flags["vehicle_present"],
-            dog_present=flags["dog_present"],
-            uniform=flags["uniform"],
         )
 
-        # 4) Build SceneObjects and object-level evidence
-        scene_objects: list[SceneObject] = []
-        for idx, det in enumerate(dets):
-            # rough entity hint
-            ent = det.cls if det.cls in ("person", "vehicle", "dog", "package") else None
+        scene_objects.append(obj)
 
-            obj = SceneObject(
-                object_id=idx,
-                label=det.cls,
-                parent_id=None,
-            )
-            obj.props["color"] = det.color
+    vr.objects = scene_objects
 
-            # evidence: class + color
-            obj.evidence.append(
-                Evidence(
-                    source="vision",
-                    feature="class",
-                    value=det.cls.lower(),
-                    conf=det.conf,
-                )
-            )
-            obj.evidence.append(
+    # 5) Global flag evidence (scene-level)
+    if flags["person_present"]:
+        vr.evidence.append(Evidence("vision", "person_present", "true", 0.9))
+    if flags["package_box"]:
+        vr.evidence.append(Evidence("vision", "package_box", "true", 0.9))
+    if flags["vehicle_present"]:
+        vr.evidence.append(Evidence("vision", "vehicle_present", "true", 0.9))
+    if flags["dog_present"]:
+        vr.evidence.append(Evidence("vision", "dog_present", "true", 0.9))
+
+    # 6) Merge object evidence into scene-level evidence
+    for obj in scene_objects:
+        vr.evidence.extend(obj.evidence)
+
+    # 7) OCR → evidence
+    if enable_ocr and dets:
+        tokens = extract_ocr_tokens(frame, dets)
+        vr.ocr_tokens = tokens
+        vr.ocr_raw = " ".join(tokens) if tokens else None
+
+        for tok in tokens:
+            vr.evidence.append(
                 Evidence(
-                    source="vision",
-                    feature="color",
-                    value=det.color.lower(),
-                    conf=0.6,
+                    source="ocr",
+                    feature="token",
+                    value=tok.lower(),
+                    conf=0.9
                 )
             )
 
-            scene_objects.append(obj)
-
-        vr.objects = scene_objects
-
-        # 5) Global flag evidence (scene-level)
-        if flags["person_present"]:
-            vr.evidence.append(Evidence("vision", "person_present", "true", 0.9))
-        if flags["package_box"]:
-            vr.evidence.append(Evidence("vision", "package_box", "true", 0.9))
-        if flags["vehicle_present"]:
-            vr.evidence.append(Evidence("vision", "vehicle_present", "true", 0.9))
-        if flags["dog_present"]:
-            vr.evidence.append(Evidence("vision", "dog_present", "true", 0.9))
-
-        # 6) Merge object evidence into scene-level evidence
-        for obj in scene_objects:
-            vr.evidence.extend(obj.evidence)
-
-        # 7) OCR → evidence
-        if enable_ocr and dets:
-            tokens = extract_ocr_tokens(frame, dets)
-            vr.ocr_tokens = tokens
-            vr.ocr_raw = " ".join(tokens) if tokens else None
-
-            for tok in tokens:
-                vr.evidence.append(
-                    Evidence(
-                        source="ocr",
-                        feature="token",
-                        value=tok.lower(),
-                        conf=0.9
-                    )
-                )
-
     return vr
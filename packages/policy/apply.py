@@ -1,10 +1,45 @@
-def eval_rule(expr:str, ctx:dict) -> bool:
-    # Safe-ish eval over a tiny context
-    allowed = {"intent":ctx["intent"], "mode":ctx["mode"], "uniform":ctx["vision"].uniform}
-    return eval(expr, {"__builtins__":{}}, allowed)
+from packages.policy.loader import compile_rules
+
+_NO_BUILTINS = {"__builtins__": {}}
+
+def _rule_names(ctx:dict) -> dict:
+    # the names a rule expression may use
+    vision = ctx["vision"]
+    return {"intent":ctx["intent"], "mode":ctx["mode"], "uniform":vision.uniform,
+            "vision":vision, "context":ctx}
+
+def eval_rule(expr, ctx:dict) -> bool:
+    # Safe-ish eval over a tiny context; expr is source or a compiled rule["_code"]
+    return eval(expr, _NO_BUILTINS, _rule_names(ctx))
+
+def _fast_hit(fast:dict, intent, mode, uniform):
+    # every way of leaving fields untested; the earliest rule wins
+    best = None
+    for key in ((intent, mode, uniform), (intent, mode, None), (intent, None, uniform),
+                (intent, None, None), (None, mode, uniform), (None, mode, None),
+                (None, None, uniform), (None, None, None)):
+        idx = fast.get(key)
+        if idx is not None and (best is None or idx < best):
+            best = idx
+    return best
 
 def choose_action(policies:dict, ctx:dict) -> dict:
-    for rule in policies.get("rules", []):
-        if eval_rule(rule["if"], ctx):
+    if "_fast_table" not in policies:
+        compile_rules(policies)
+    intent = ctx["intent"]
+    fast = policies["_fast_table"]
+    best = _fast_hit(fast, intent, ctx["mode"], ctx["vision"].uniform) if fast else None
+
+    # rules the table can't express, that can fire for this intent and
+    # come before the table's hit in the file
+    names = None
+    for rule in policies["_dispatch"].get(intent, policies["_dispatch_any"]):
+        if best is not None and rule["_index"] > best:
+            break
+        if names is None:
+            names = _rule_names(ctx)
+        if eval(rule["_code"], _NO_BUILTINS, names):
             return rule["then"]
+    if best is not None:
+        return policies["rules"][best]["then"]
     return policies.get("fallback", {"speak":"Sorry—could you repeat that?","notify":"normal"})
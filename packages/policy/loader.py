@@ -1,11 +1,105 @@
-import yaml, pathlib, os
+import yaml, pathlib, os, ast
 
-def load_policies(path="config/policies.yaml"):
+# libyaml's C loader when PyYAML was built with it; same safe subset
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+# Project root (two levels up from this file), for relative policy paths
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+_DEFAULT_PATH = os.path.join(_PROJECT_ROOT, "config", "policies.yaml")
+
+# absolute path -> (st_mtime_ns, compiled policies)
+_CACHE: dict[str, tuple[int, dict]] = {}
+
+# context names a rule can be keyed on in the fast table
+_KEY_FIELDS = ("intent", "mode", "uniform")
+
+def _eq_const(node) -> tuple[str, str] | None:
+    """(name, value) for a `name == 'value'` test (either way round), else None."""
+    if (isinstance(node, ast.Compare) and len(node.ops) == 1
+            and isinstance(node.ops[0], ast.Eq)):
+        left, right = node.left, node.comparators[0]
+        if isinstance(right, ast.Name):
+            left, right = right, left
+        if (isinstance(left, ast.Name)
+                and isinstance(right, ast.Constant) and isinstance(right.value, str)):
+            return left.id, right.value
+    return None
+
+def _fast_key(node) -> tuple | None:
+    """
+    (intent, mode, uniform) for a rule that is only `==` tests on those
+    names joined by `and`, with None for a name it doesn't test; None if
+    the rule is anything more complex.
+    """
+    terms = node.values if isinstance(node, ast.BoolOp) and isinstance(node.op, ast.And) else [node]
+    key = {}
+    for term in terms:
+        eq = _eq_const(term)
+        if eq is None or eq[0] not in _KEY_FIELDS or eq[0] in key:
+            return None
+        key[eq[0]] = eq[1]
+    return tuple(key.get(f) for f in _KEY_FIELDS)
+
+def _required_intent(node) -> str | None:
+    """
+    The intent a rule expression can only be true for, if it pins one:
+    `intent == 'x'` on its own or as one of the terms of an `and`.
+    """
+    terms = node.values if isinstance(node, ast.BoolOp) and isinstance(node.op, ast.And) else [node]
+    for term in terms:
+        eq = _eq_const(term)
+        if eq is not None and eq[0] == "intent":
+            return eq[1]
+    return None
+
+def compile_rules(policies: dict) -> dict:
+    """
+    Prepare policies["rules"] for choose_action, once at load time:
+    - r["_code"], r["_index"]: the compiled `if` expression, file position
+    - policies["_fast_table"]: (intent, mode, uniform) -> index of the first
+      rule that is just `==` tests on those (None = not tested)
+    - policies["_dispatch"]:     intent -> the other rules that can fire for it
+    - policies["_dispatch_any"]: the other rules that don't pin an intent
+    The dispatch lists keep file order; choose_action weighs them against
+    the fast-table hit by _index, so the first match in the file still wins.
+    """
+    rules = policies.get("rules") or []
+    fast = {}
+    residual = []  # (rule, required intent or None)
+    for i, r in enumerate(rules):
+        tree = ast.parse(r["if"], mode="eval")
+        r["_code"] = compile(tree, f"<policy:{r.get('name', i)}>", "eval")
+        r["_index"] = i
+        key = _fast_key(tree.body)
+        if key is not None:
+            fast.setdefault(key, i)
+        else:
+            residual.append((r, _required_intent(tree.body)))
+
+    policies["_fast_table"] = fast
+    policies["_dispatch"] = {
+        intent: [r for r, req in residual if req is None or req == intent]
+        for intent in {req for _, req in residual} - {None}
+    }
+    policies["_dispatch_any"] = [r for r, req in residual if req is None]
+    return policies
+
+def load_policies(path=_DEFAULT_PATH):
     # If path is relative, make it relative to the project root
-    if not os.path.isabs(path):
-        # Get the project root (two levels up from this file)
-        project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-        path = os.path.join(project_root, path)
+    if path is not _DEFAULT_PATH and not os.path.isabs(path):
+        path = os.path.join(_PROJECT_ROOT, path)
     
+    # Re-parse only when the file changed. Callers share the cached dict,
+    # so treat it as read-only.
+    mtime_ns = os.stat(path).st_mtime_ns
+    hit = _CACHE.get(path)
+    if hit is not None and hit[0] == mtime_ns:
+        return hit[1]
+
     with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
\ No newline at end of file
+        policies = compile_rules(yaml.load(f, Loader=_Loader))
+    _CACHE[path] = (mtime_ns, policies)
+    return policies
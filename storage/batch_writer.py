@@ -0,0 +1,65 @@
+import sqlite3, threading, contextlib
+from queue import Empty, SimpleQueue
+
+class BatchWriter:
+    """
+    Background thread that writes queued rows for one INSERT statement.
+    put(rows) only enqueues; the thread writes whatever has queued up, up
+    to max_rows rows per transaction (waiting up to `wait` seconds for
+    more), with one executemany. Rows from one put() always land in the
+    same transaction. A batch that fails is rolled back and dropped, and
+    the thread keeps going.
+
+    conn must be in autocommit mode (isolation_level=None). If other
+    threads use it too, pass their lock as `lock`.
+    """
+    def __init__(self, conn, sql, *, name, max_rows=256, wait=0.05, lock=None):
+        self._conn = conn
+        self._sql = sql
+        self._name = name
+        self._max_rows = max_rows
+        self._wait = wait
+        self._lock = lock or contextlib.nullcontext()
+        self._q = SimpleQueue()
+        threading.Thread(target=self._run, daemon=True, name=name).start()
+
+    def put(self, rows):
+        self._q.put(rows)
+
+    def flush(self, timeout=5.0):
+        """Block until everything queued before this call is written."""
+        done = threading.Event()
+        self._q.put(done)
+        return done.wait(timeout)
+
+    def _run(self):
+        q = self._q
+        while True:
+            rows, waiters = [], []
+            item = q.get()
+            while True:
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    rows.extend(item)
+                if len(rows) >= self._max_rows:
+                    break
+                try:
+                    item = q.get(timeout=self._wait)
+                except Empty:
+                    break
+
+            if rows:
+                with self._lock:
+                    conn = self._conn
+                    try:
+                        conn.execute("BEGIN IMMEDIATE")
+                        conn.executemany(self._sql, rows)
+                        conn.execute("COMMIT")
+                    except sqlite3.Error as e:
+                        # never leave the connection holding the write lock
+                        if conn.in_transaction:
+                            conn.execute("ROLLBACK")
+                        print(f"[{self._name}] dropped {len(rows)} row(s):", e)
+            for w in waiters:
+                w.set()
@@ -1,14 +1,28 @@
-import sqlite3, glob, os, pathlib
+import sqlite3, os, pathlib
 
 DB_PATH = pathlib.Path(__file__).resolve().parents[1] / "data" / "doorbell.db"
 SCHEMA_PATH = pathlib.Path(__file__).resolve().parents[1] / "infra" / "db" / "schema.sql"
 MIGRATIONS_PATH = pathlib.Path(__file__).resolve().parents[1] / "infra" / "db" / "migrations"
 
+# (migrations dir st_mtime_ns, [(version, path), ...]); see _migrations
+_MIGRATIONS = None
+
+def _connect():
+    conn = sqlite3.connect(DB_PATH)
+    # WAL is stored in the file, so readers stop blocking the writer for
+    # every later connection too; the rest are per-connection tuning.
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")   # 256 MiB
+    conn.execute("PRAGMA cache_size=-65536")     # 64 MiB
+    return conn
+
 def ensure_db_exists():
     """Create DB file and base schema if missing."""
     DB_PATH.parent.mkdir(exist_ok=True)
     new_db = not DB_PATH.exists()
-    conn = sqlite3.connect(DB_PATH)
+    conn = _connect()
     if new_db:
         print("Initializing new database…")
         with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
@@ -17,22 +31,66 @@ def ensure_db_exists():
     conn.close()
     return new_db
 
+def _migrations():
+    """(version, path) for every migration file, sorted; re-listed only when the directory changes."""
+    global _MIGRATIONS
+    mtime_ns = os.stat(MIGRATIONS_PATH).st_mtime_ns
+    if _MIGRATIONS is None or _MIGRATIONS[0] != mtime_ns:
+        found = []
+        with os.scandir(MIGRATIONS_PATH) as it:
+            for entry in it:
+                name = entry.name
+                if name.endswith(".sql") and entry.is_file():
+                    found.append((int(name[:name.index("_")]), entry.path))
+        _MIGRATIONS = (mtime_ns, sorted(found))
+    return _MIGRATIONS[1]
+
+def _statements(sql):
+    """Split a script into single statements (sqlite3.complete_statement decides where one ends)."""
+    buf = ""
+    for piece in sql.split(";"):
+        buf += piece + ";"
+        if sqlite3.complete_statement(buf):
+            yield buf
+            buf = ""
+    if buf[:-1].strip():
+        yield buf[:-1]  # trailing comment, or an unterminated statement
+
 def migrate():
     """Apply any migration files newer than PRAGMA user_version."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = _connect()
     cur = conn.cursor()
     cur.execute("PRAGMA user_version;")
     current = cur.fetchone()[0]
 
-    migrations = sorted(glob.glob(os.path.join(MIGRATIONS_PATH, "*.sql")))
-    for path in migrations:
-        version = int(os.path.basename(path).split("_")[0])
+    migrations = _migrations()
+    if not migrations or current >= migrations[-1][0]:
+        conn.close()  # already up to date
+        return
+
+    # SQLite ignores PRAGMA foreign_keys inside a transaction, so the one
+    # at the top of the migration files would be a no-op: turn it on here.
+    conn.isolation_level = None
+    cur.execute("PRAGMA foreign_keys = ON;")
+    for version, path in migrations:
         if version > current:
             print(f"Applying migration {version}: {os.path.basename(path)}")
             with open(path, "r", encoding="utf-8") as f:
-                cur.executescript(f.read())
-            cur.execute(f"PRAGMA user_version = {version};")
-            conn.commit()
+                sql = f.read()
+            # statement by statement rather than executescript (which
+            # commits first), so the migration and its version bump share
+            # one transaction and one commit
+            try:
+                cur.execute("BEGIN;")
+                for stmt in _statements(sql):
+                    cur.execute(stmt)
+                cur.execute(f"PRAGMA user_version = {version};")
+                cur.execute("COMMIT;")
+            except sqlite3.Error:
+                if conn.in_transaction:
+                    cur.execute("ROLLBACK;")
+                conn.close()
+                raise
     conn.close()
 
 def init_or_migrate():
@@ -1,9 +1,63 @@
-import sqlite3, json, datetime
+import sqlite3, json, datetime, threading, atexit
+from storage.batch_writer import BatchWriter
+
+_INSERT_EVENT = """INSERT INTO events(type,intent,confidence,urgency,mode,snapshot_path,transcript,actions)
+                   VALUES(?,?,?,?,?,?,?,?)"""
+
+BATCH_ROWS = 256     # max rows per transaction
+BATCH_WAIT = 0.05    # seconds the writer waits for more rows before committing
+
+# one encoder for every row instead of json.dumps building one per call;
+# compact, and non-ASCII (the policy texts use curly quotes) stored as-is
+_ENCODE = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+def _event_row(*, etype, intent=None, confidence=None, urgency=None, mode=None, snapshot=None, transcript=None, actions=None):
+    return (etype,intent,confidence,urgency,mode,snapshot,transcript,_ENCODE(actions) if actions else None)
+
+class _Writer:
+    """
+    One long-lived connection and BatchWriter per database.
+    log_event(s) only enqueue; rows from one log_events call always land
+    in the same transaction.
+    """
+    def __init__(self, db_path):
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL"); self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._batch = BatchWriter(self._conn, _INSERT_EVENT, name="event-writer",
+                                  max_rows=BATCH_ROWS, wait=BATCH_WAIT)
+        self.put = self._batch.put
+        self.flush = self._batch.flush
+
+_writers = {}               # db_path -> _Writer
+_writers_lock = threading.Lock()
+
+def _writer(db_path):
+    w = _writers.get(db_path)
+    if w is None:
+        with _writers_lock:
+            w = _writers.get(db_path)
+            if w is None:
+                w = _writers[db_path] = _Writer(db_path)
+    return w
+
+def flush(timeout=5.0):
+    """Wait for every queued event to be written."""
+    for w in list(_writers.values()):
+        w.flush(timeout)
+
+def _close_all():
+    # at exit: write what's queued, then close each writer's connection
+    # (the last close checkpoints the WAL back into the database file)
+    for w in list(_writers.values()):
+        if w.flush():
+            w._conn.close()
+
+atexit.register(_close_all)
+
+def log_events(db_path, events):
+    """Queue several events (dicts of log_event keyword args), written in one transaction."""
+    _writer(db_path).put([_event_row(**e) for e in events])
 
 def log_event(db_path, *, etype, intent=None, confidence=None, urgency=None, mode=None, snapshot=None, transcript=None, actions=None):
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    cur.execute("""INSERT INTO events(type,intent,confidence,urgency,mode,snapshot_path,transcript,actions)
-                   VALUES(?,?,?,?,?,?,?,?)""",
-                (etype,intent,confidence,urgency,mode,snapshot,transcript,json.dumps(actions) if actions else None))
-    conn.commit(); conn.close()
+    _writer(db_path).put([_event_row(etype=etype, intent=intent, confidence=confidence, urgency=urgency, mode=mode,
+                                     snapshot=snapshot, transcript=transcript, actions=actions)])
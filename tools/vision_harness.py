@@ -2,34 +2,48 @@ import os
 import sys
 import sqlite3
 import argparse
-import glob
+import contextlib
+import io
+from concurrent.futures import ProcessPoolExecutor
 
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
 from packages.perception.vision import snapshot_and_detect
-from packages.classify.intent import classify
+from packages.classify.intent import classify, format_trace
 
 
 VALID_EXT = (".jpg", ".jpeg", ".png")
 
 
+def _iter_annotated(d: str):
+    """
+    Depth-first paths of files under d with 'annotated' in the name.
+    scandir entries carry the file type from the directory listing, so
+    this doesn't stat each file the way glob("**") does.
+    """
+    with os.scandir(d) as it:
+        for e in it:
+            if e.is_dir(follow_symlinks=False):
+                yield from _iter_annotated(e.path)
+            elif "annotated" in e.name and e.is_file(follow_symlinks=False):
+                yield e.path
+
+
 def cleanup_annotated_files(data_root: str):
     """
     Delete all files with 'annotated' in the filename from data folder and subfolders.
     """
     deleted_count = 0
-    pattern = os.path.join(data_root, "**", "*annotated*")
     
-    for file_path in glob.glob(pattern, recursive=True):
-        if os.path.isfile(file_path):
-            try:
-                os.remove(file_path)
-                print(f"[CLEANUP] Deleted: {file_path}")
-                deleted_count += 1
-            except Exception as e:
-                print(f"[CLEANUP] Failed to delete {file_path}: {e}")
+    for file_path in _iter_annotated(data_root):
+        try:
+            os.remove(file_path)
+            print(f"[CLEANUP] Deleted: {file_path}")
+            deleted_count += 1
+        except Exception as e:
+            print(f"[CLEANUP] Failed to delete {file_path}: {e}")
     
     if deleted_count > 0:
         print(f"[CLEANUP] Removed {deleted_count} annotated file(s)\n")
@@ -42,16 +56,33 @@ def walk_dataset(root: str):
     Yields tuples: (folder_name, file_path)
     Example: ('police', 'samples/police/1.png')
     """
-    for dirpath, dirs, files in os.walk(root):
-        # Skip the root itself (we want subfolders)
-        if dirpath == root:
-            continue
-
-        folder = os.path.basename(dirpath)
-
-        for f in files:
-            if f.lower().endswith(VALID_EXT):
-                yield folder, os.path.join(dirpath, f)
+    # Skip the root itself (we want subfolders)
+    with os.scandir(root) as it:
+        subdirs = [e.path for e in it if e.is_dir(follow_symlinks=False)]
+
+    for d in subdirs:
+        yield from _walk_images(d)
+
+
+def _walk_images(d: str):
+    """Same order as os.walk: a folder's images, then its subfolders'."""
+    folder = os.path.basename(d)
+    images, subdirs = [], []
+    with os.scandir(d) as it:
+        for e in it:
+            if e.is_dir(follow_symlinks=False):
+                subdirs.append(e.path)
+                continue
+            # only the extension is lowercased, not the whole name
+            name = e.name
+            dot = name.rfind(".")
+            if dot >= 0 and name[dot:].lower() in VALID_EXT and e.is_file():
+                images.append(e.path)
+
+    for path in images:
+        yield folder, path
+    for sub in subdirs:
+        yield from _walk_images(sub)
 
 
 def format_detection(det):
@@ -60,64 +91,116 @@ def format_detection(det):
     return f"{det.cls}, color={det.color}, conf={det.conf:.2f}, box=({x1},{y1},{x2},{y2})"
 
 
-def run_dataset(db_path: str, dataset_root: str, debug: bool = False):
-    print(f"\n[DATASET] scanning: {dataset_root}")
-    print(f"[DATASET] using DB: {db_path}\n")
-    
-    # Clean up any annotated files before running tests
-    cleanup_annotated_files(dataset_root)
-
-    results = []
+def _init_worker():
+    """
+    Pool initializer: one compute thread per worker. Each process loads its
+    own model, and torch/OpenCV would otherwise each start a pool as wide
+    as the machine in every worker (~cores^2 threads fighting for cores).
+    """
+    import cv2
+    cv2.setNumThreads(1)
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(1)
 
-    for folder, file_path in walk_dataset(dataset_root):
-        print("=" * 80)
-        print(f"[TEST CASE] folder={folder} file={file_path}")
 
+def _process(task):
+    """
+    Pool worker: vision + classification for one image. Anything the
+    pipeline prints (YOLO debug output) is captured and handed back, so
+    the parent can print it in dataset order.
+    """
+    folder, file_path, db_path, debug = task
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
         # 1) Run vision
         vr = snapshot_and_detect(db_path, file_path, debug=debug)
 
         # 2) Run intent classification (just vision; text="")
         classified = classify("", vr, db_path=db_path)
+    return folder, file_path, vr, classified, buf.getvalue()
 
-        # 3) Print detections summary
-        print("Detections:")
-        if not vr.detections:
-            print("  (none)")
-        else:
-            for det in vr.detections:
-                print("  -", format_detection(det))
 
-        # 4) Evidence summary (new world)
-        print("\nEvidence (scene-level):")
-        if not getattr(vr, "evidence", None):
-            print("  (none)")
-        else:
-            # print a few so output doesn't explode
-            for ev in vr.evidence[:30]:
-                oid = getattr(ev, "object_id", None)
-                print(f"  - src={ev.source} feat={ev.feature} val={ev.value} conf={ev.conf:.2f} obj={oid}")
-            if len(vr.evidence) > 30:
-                print(f"  ... ({len(vr.evidence) - 30} more)")
-
-        # 5) Final classified intent
-        print("\nClassified intent:")
-        print(f"  intent  = {classified.intent}")
-        print(f"  conf    = {classified.conf:.2f}")
-        print(f"  urgency = {classified.urgency}")
-        if (vr.ocr_raw):
-            print("\nOCR tokens:")
-            print(f"  raw: {vr.ocr_raw}")
+def _format_case(vr, classified) -> list[str]:
+    out = []
+    # 3) Detections summary
+    out.append("Detections:")
+    if not vr.detections:
+        out.append("  (none)")
+    else:
+        for det in vr.detections:
+            out.append(f"  - {format_detection(det)}")
+
+    # 4) Evidence summary (new world)
+    out.append("\nEvidence (scene-level):")
+    if not getattr(vr, "evidence", None):
+        out.append("  (none)")
+    else:
+        # show a few so output doesn't explode
+        for ev in vr.evidence[:30]:
+            oid = getattr(ev, "object_id", None)
+            out.append(f"  - src={ev.source} feat={ev.feature} val={ev.value} conf={ev.conf:.2f} obj={oid}")
+        if len(vr.evidence) > 30:
+            out.append(f"  ... ({len(vr.evidence) - 30} more)")
+
+    # 5) Final classified intent
+    out.append("\nClassified intent:")
+    out.append(f"  intent  = {classified.intent}")
+    out.append(f"  conf    = {classified.conf:.2f}")
+    out.append(f"  urgency = {classified.urgency}")
+    if (vr.ocr_raw):
+        out.append("\nOCR tokens:")
+        out.append(f"  raw: {vr.ocr_raw}")
+    else:
+        out.append("\nOCR tokens: (none)")
+
+    out.append("\n--- TRACE ---")
+    if classified.trace:
+        for line in format_trace(classified.trace):
+            out.append(line)
+            out.append("")
+    return out
+
+
+def run_dataset(db_path: str, dataset_root: str, debug: bool = False,
+                workers: int | None = None):
+    """
+    Run every image through vision + classify on a process pool of
+    `workers` processes (default: one per CPU; 1 runs in-process).
+    Output and results stay in dataset order.
+    """
+    print(f"\n[DATASET] scanning: {dataset_root}")
+    print(f"[DATASET] using DB: {db_path}\n")
+    
+    # Clean up any annotated files before running tests
+    cleanup_annotated_files(dataset_root)
+
+    results = []
+
+    tasks = [(folder, file_path, db_path, debug)
+             for folder, file_path in walk_dataset(dataset_root)]
+    workers = workers or os.cpu_count() or 1
+
+    with contextlib.ExitStack() as stack:
+        if workers > 1 and len(tasks) > 1:
+            pool = stack.enter_context(
+                ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+            )
+            done = pool.map(_process, tasks, chunksize=8)
         else:
-            print("\nOCR tokens: (none)")
+            done = map(_process, tasks)
 
-        print("\n--- TRACE ---")
-        if classified.trace:
-            for line in classified.trace:
-                print(line)
+        # one write per image instead of a print per line
+        write = sys.stdout.write
+        for folder, file_path, vr, classified, log in done:
+            write("=" * 80 + f"\n[TEST CASE] folder={folder} file={file_path}\n" + log
+                  + "\n".join(_format_case(vr, classified)) + "\n")
 
-                print()
+            results.append((folder, file_path, vr, classified))
 
-        results.append((folder, file_path, vr, classified))
+    sys.stdout.flush()
 
     return results
 
@@ -140,9 +223,15 @@ def main():
         default=True,
         help="Enable YOLO debug output"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: one per CPU; 1 = no pool)"
+    )
     args = parser.parse_args()
 
-    run_dataset(args.db, args.dataset, debug=args.debug)
+    run_dataset(args.db, args.dataset, debug=args.debug, workers=args.workers)
 
 
 if __name__ == "__main__":